@@ -0,0 +1,75 @@
+"""
+Load time and peak memory for documents holding one large data blob.
+
+    python benchmarks/blobs.py [--sizes 1,10,100] [--repeat R] [--tatsu]
+
+For each size in MB, a dictionary with one blob is written as spaced hex
+(the default output), plain hex (compact) and base64 (compact, GNUstep), and
+read back from bytes and from a str with the fast engine, and as each
+`data_type`. The tatsu engine is slow on documents this size; `--tatsu` adds
+it for the smallest one only.
+"""
+import argparse
+import os
+import time
+import tracemalloc
+
+from text_plistlib.impl import TextPlistDialects
+from text_plistlib.plistlib import FMT_TEXT, dumps, loads
+
+
+def encodings(blob):
+    yield "hex", dumps({"blob": blob})
+    yield "hex/compact", dumps({"blob": blob}, compact=True, dialect=TextPlistDialects.OpenStep)
+    yield "base64", dumps({"blob": blob}, compact=True)
+
+
+def measure(func, repeat):
+    """Best time of `repeat` runs, and the peak traced bytes of one more."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return min(times), peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", default="1,10,100")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--tatsu", action="store_true")
+    args = parser.parse_args()
+    sizes = [float(s) for s in args.sizes.split(",")]
+    print("{:>6} {:<12}{:<7}{:<7}{:<11}{:>9}{:>9}{:>12}".format(
+        "MB", "encoding", "input", "engine", "data_type", "s", "MB/s", "peak/blob"))
+    for size in sizes:
+        blob = os.urandom(int(size * 1e6))
+        for name, data in encodings(blob):
+            cases = [
+                ("bytes", "fast", bytes, data),
+                ("str", "fast", bytes, data.decode("ascii")),
+                ("bytes", "fast", bytearray, data),
+                ("bytes", "fast", memoryview, data),
+            ]
+            if args.tatsu and size == min(sizes):
+                cases.append(("bytes", "tatsu", bytes, data))
+            for kind, engine, data_type, source in cases:
+                def load(source=source, engine=engine, data_type=data_type):
+                    return loads(source, fmt=FMT_TEXT, engine=engine, data_type=data_type)
+
+                assert load()["blob"] == blob
+                seconds, peak = measure(load, 1 if engine == "tatsu" else args.repeat)
+                print("{:>6g} {:<12}{:<7}{:<7}{:<11}{:>9.4f}{:>9.1f}{:>12.2f}".format(
+                    size, name, kind, engine, data_type.__name__,
+                    seconds, len(data) / seconds / 1e6, peak / len(blob)))
+
+
+if __name__ == "__main__":
+    main()
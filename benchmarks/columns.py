@@ -0,0 +1,58 @@
+"""
+Loading and dumping an array of dictionaries as rows and as columns.
+
+    python benchmarks/columns.py [--rows N] [--seed N] [--repeat R]
+
+The table is sensor readings with the same keys in every row: a time, two
+floats, a count and a short label. It is loaded with the fast engine as it is
+and with `columns=["samples"]`, then dumped back from what was loaded. "Kept"
+is as in `intern.py`.
+"""
+import argparse
+import random
+
+from text_plistlib.plistlib import FMT_TEXT, dumps, loads
+
+from intern import best, kept
+
+
+def samples(rng, n):
+    labels = ["north", "south", "east", "west"]
+    return {
+        "samples": [
+            {
+                "t": i,
+                "x": rng.random(),
+                "y": rng.gauss(0, 1),
+                "count": rng.randrange(1000),
+                "label": rng.choice(labels),
+            }
+            for i in range(n)
+        ]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    text = dumps(samples(random.Random(args.seed), args.rows))
+    print("{:<9}{:>9}{:>9}{:>12}{:>8}".format("as", "load s", "dump s", "kept KiB", "kept"))
+    baseline = None
+    for name, kwargs in [("rows", {}), ("columns", {"columns": ["samples"]})]:
+        def load(kwargs=kwargs):
+            return loads(text, fmt=FMT_TEXT, engine="fast", **kwargs)
+
+        value = load()
+        assert dumps(value) == text
+        load_s = best(load, args.repeat)
+        dump_s = best(lambda: dumps(value), args.repeat)
+        size = kept(load)
+        baseline = baseline or size
+        print("{:<9}{:>9.4f}{:>9.4f}{:>12.1f}{:>7.0%}".format(name, load_s, dump_s, size / 1024, size / baseline))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Output size and dump time of compact=True against the default pretty output.
+
+    python benchmarks/compact.py [--count N] [--seed N] [--repeat R]
+
+Each document has `--count` records, blobs or nested entries, and four times
+as many strings.
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from text_plistlib.impl import TextPlistDialects
+from text_plistlib.plistlib import dumps
+
+
+def documents(rng, n):
+    base = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    yield "strings", {"key_%d" % i: "Value number %d" % i for i in range(4 * n)}
+    yield "records", [
+        {
+            "id": i,
+            "name": "item%d" % i,
+            "score": rng.random() * 100,
+            "tags": ["t%d" % rng.randrange(50) for _ in range(3)],
+            "when": base + timedelta(seconds=rng.randrange(10 ** 8)),
+            "flag": bool(i % 2),
+        }
+        for i in range(n)
+    ]
+    yield "blobs", [rng.randbytes(rng.randrange(1, 64)) for _ in range(n)]
+    yield "nested", {"a": [{"b": [{"c": [i, str(i)]}]} for i in range(n)]}
+
+
+def best(func, repeat=5):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--count", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=9)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    print("{:<9}{:<10}{:>10}{:>11}{:>7}{:>11}{:>12}".format(
+        "doc", "dialect", "pretty B", "compact B", "ratio", "pretty ms", "compact ms"))
+    for name, value in documents(random.Random(args.seed), args.count):
+        for dialect in (TextPlistDialects.GNUstep, TextPlistDialects.OpenStep):
+            pretty = dumps(value, dialect=dialect)
+            compact = dumps(value, dialect=dialect, compact=True)
+            print("{:<9}{:<10}{:>10}{:>11}{:>7.2f}{:>11.1f}{:>12.1f}".format(
+                name,
+                dialect.name,
+                len(pretty),
+                len(compact),
+                len(compact) / len(pretty),
+                best(lambda: dumps(value, dialect=dialect), args.repeat) * 1e3,
+                best(lambda: dumps(value, dialect=dialect, compact=True), args.repeat) * 1e3,
+            ))
+
+
+if __name__ == "__main__":
+    main()
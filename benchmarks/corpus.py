@@ -0,0 +1,129 @@
+"""
+Deterministic synthetic documents for the benchmarks.
+
+Every workload is built from its own seeded random generator, so the same
+`scale` and `seed` always give the same values and the same serialized bytes.
+
+    python benchmarks/corpus.py OUTDIR [--scale S] [--seed N]
+
+writes each workload into OUTDIR as a text plist, for use with other tools.
+"""
+import argparse
+import os
+import random
+import string
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+
+from text_plistlib.plistlib import dumps
+
+# `dump_kwargs` say how the document is written: `strings=True` for a
+# .strings table, `compact=True` to get base64 for large data.
+Workload = namedtuple("Workload", "name value dump_kwargs")
+
+_WORDS = [
+    "".join(random.Random(i).choices(string.ascii_lowercase, k=3 + i % 7))
+    for i in range(512)
+]
+
+
+def _sentence(rng, words):
+    return " ".join(rng.choice(_WORDS) for _ in range(words))
+
+
+def flat_strings(rng, n):
+    """A localization table: many keys, short human text, a few escapes."""
+    table = {}
+    for i in range(n):
+        value = _sentence(rng, rng.randrange(1, 12))
+        if i % 10 == 0:
+            value += '\n"quoted" é'
+        table["%s_%d" % (rng.choice(_WORDS), i)] = value
+    return table
+
+
+def records(rng, n):
+    """Dictionaries with the same keys, and values from a few choices, as in exports."""
+    kinds = ["document", "folder", "alias", "package", "volume"]
+    states = ["active", "inactive", "pending", "archived"]
+    return [
+        {
+            "identifier": "%08x" % rng.getrandbits(32),
+            "kind": rng.choice(kinds),
+            "state": rng.choice(states),
+            "title": _sentence(rng, rng.randrange(1, 4)),
+            "size": rng.randrange(1 << 20),
+            "tags": [rng.choice(_WORDS) for _ in range(rng.randrange(3))],
+        }
+        for _ in range(n)
+    ]
+
+
+def deep_nesting(rng, depth):
+    """Dictionaries and arrays alternating, `depth` levels deep."""
+    value = "leaf"
+    for i in range(depth):
+        value = {"k%d" % rng.randrange(10): value} if i % 2 else [value]
+    return value
+
+
+def blobs(rng, count, size):
+    """Binary data of around `size` bytes each."""
+    return {
+        "blob%d" % i: rng.randbytes(rng.randrange(size // 2, size * 3 // 2 + 1))
+        for i in range(count)
+    }
+
+
+def dates(rng, n):
+    """Timestamps spread over about thirty years, all in UTC."""
+    base = datetime(2000, 1, 1, tzinfo=timezone.utc)
+    return [base + timedelta(seconds=rng.randrange(10 ** 9)) for _ in range(n)]
+
+
+def numbers(rng, rows, width):
+    """Rows of integers and floats, as in exported measurements."""
+    return [
+        [rng.randrange(-(10 ** 9), 10 ** 9) for _ in range(width // 2)]
+        + [rng.uniform(-1e6, 1e6) for _ in range(width - width // 2)]
+        for _ in range(rows)
+    ]
+
+
+def corpus(scale: float = 1.0, seed: int = 0):
+    """All workloads, with sizes multiplied by `scale`."""
+
+    def n(count):
+        return max(1, int(count * scale))
+
+    def rng(name):
+        return random.Random("%d:%s" % (seed, name))
+
+    return [
+        Workload("flat_strings", flat_strings(rng("flat_strings"), n(50000)), {"strings": True}),
+        Workload("records", records(rng("records"), n(20000)), {}),
+        Workload("deep_nesting", deep_nesting(rng("deep_nesting"), n(2000)), {}),
+        Workload("hex_blobs", blobs(rng("hex_blobs"), n(200), 16384), {}),
+        Workload("base64_blobs", blobs(rng("base64_blobs"), n(200), 16384), {"compact": True}),
+        Workload("dates", dates(rng("dates"), n(50000)), {}),
+        Workload("numbers", numbers(rng("numbers"), n(1000), 64), {}),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("outdir")
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    os.makedirs(args.outdir, exist_ok=True)
+    for workload in corpus(args.scale, args.seed):
+        suffix = ".strings" if workload.dump_kwargs.get("strings") else ".plist"
+        path = os.path.join(args.outdir, workload.name + suffix)
+        with open(path, "wb") as f:
+            f.write(dumps(workload.value, **workload.dump_kwargs))
+        print(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Date parsing and formatting, against strptime and strftime.
+
+    python benchmarks/dates.py [--scale S] [--seed N] [--repeat R]
+
+First each way of reading and writing one `<*D...>` date on its own, then the
+`dates` workload from `corpus.py` dumped and loaded with the fast engine, both
+as it is (in UTC) and dumped with `utc=False` from dates spread over a few
+time zones, as in event logs.
+"""
+import argparse
+import random
+from datetime import datetime, timedelta, timezone
+
+from text_plistlib.dates import FORMAT, format_date, parse_date
+from text_plistlib.plistlib import FMT_TEXT, dumps, loads
+
+from corpus import corpus
+from intern import best
+
+ZONES = [timezone(timedelta(hours=h)) for h in (-8, -5, 0, 1, 5.5, 9)]
+
+
+def codec(dates, repeat):
+    texts = [d.strftime(FORMAT) for d in dates]
+    cases = [
+        ("strptime", lambda: [datetime.strptime(s, FORMAT) for s in texts]),
+        ("parse_date", lambda: [parse_date(s) for s in texts]),
+        ("strftime", lambda: [d.astimezone(timezone.utc).strftime(FORMAT) for d in dates]),
+        ("format_date", lambda: [format_date(d) for d in dates]),
+    ]
+    for name, func in cases:
+        seconds = best(func, repeat)
+        print("{:<14}{:>9.3f} us".format(name, seconds / len(dates) * 1e6))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    dates = next(w.value for w in corpus(args.scale, args.seed) if w.name == "dates")
+    rng = random.Random(args.seed)
+    local = [d.astimezone(rng.choice(ZONES)) for d in dates]
+    codec(local, args.repeat)
+    print()
+    print("{:<9}{:>9}{:>9}".format("dates", "dump s", "load s"))
+    for name, value, kwargs in [("utc", {"dates": dates}, {}), ("local", {"dates": local}, {"utc": False})]:
+        text = dumps(value, **kwargs)
+
+        def load(text=text):
+            return loads(text, fmt=FMT_TEXT, engine="fast")
+
+        assert load() == value
+        dump_s = best(lambda: dumps(value, **kwargs), args.repeat)
+        print("{:<9}{:>9.4f}{:>9.4f}".format(name, dump_s, best(load, args.repeat)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Per-level cost of nesting, for the fast engine and the lazy mode.
+
+    python benchmarks/depth.py [--repeat R] [depth ...]
+
+Prints the best time per nesting level over a few runs, for arrays nested in
+arrays and for dictionaries nested in dictionaries. The tatsu engine, which
+recurses for every level, is the baseline; it only gets as deep as the
+recursion limit allows, a few dozen levels.
+"""
+import argparse
+import time
+
+from text_plistlib import TextPlistParser
+
+
+def best(func, repeat=5):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("depths", metavar="depth", type=int, nargs="*", default=[10, 50, 100, 1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    parsers = {
+        "tatsu": TextPlistParser(engine="tatsu"),
+        "fast": TextPlistParser(engine="fast"),
+        "lazy": TextPlistParser(lazy=True),
+    }
+    for depth in args.depths:
+        docs = {
+            "arrays": "(" * depth + "a" + ")" * depth,
+            "dicts": "{a = " * depth + "b" + "; }" * depth,
+        }
+        for doc_name, doc in docs.items():
+            for name, parser in parsers.items():
+                if name == "lazy":
+                    def run():
+                        parser.parse_buffer(doc).materialize()
+                else:
+                    def run():
+                        parser.parse_buffer(doc)
+                try:
+                    per_level = "{t:8.2f} us/level".format(t=best(run, args.repeat) / depth * 1e6)
+                except RecursionError:
+                    per_level = "too deep"
+                print("{d:>8} {doc:<7} {name:<5} {t}".format(d=depth, doc=doc_name, name=name, t=per_level))
+
+
+if __name__ == "__main__":
+    main()
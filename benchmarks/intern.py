@@ -0,0 +1,73 @@
+"""
+Memory kept by loaded values, and load time, with and without interning.
+
+    python benchmarks/intern.py [--scale S] [--seed N] [--repeat R]
+
+The workloads from `corpus.py` that are mostly strings are loaded with the fast
+engine as it is, with `intern_keys=True`, and with `intern_values` as well.
+"Kept" is what tracemalloc still counts while the loaded value is alive, so
+it leaves out what the parser only needed along the way.
+"""
+import argparse
+import time
+import tracemalloc
+
+from text_plistlib.plistlib import FMT_TEXT, dumps, loads
+
+from corpus import corpus
+
+WORKLOADS = ("flat_strings", "records")
+OPTIONS = [
+    ("none", {}),
+    ("keys", {"intern_keys": True}),
+    ("keys+values", {"intern_keys": True, "intern_values": True}),
+]
+
+
+def kept(func):
+    """Bytes still traced after `func()`, while its result is alive."""
+    tracemalloc.start()
+    try:
+        result = func()
+        size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del result
+    return size
+
+
+def best(func, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    print("{:<14}{:<13}{:>9}{:>12}{:>8}".format("workload", "interning", "s", "kept KiB", "kept"))
+    for workload in corpus(args.scale, args.seed):
+        if workload.name not in WORKLOADS:
+            continue
+        text = dumps(workload.value, **workload.dump_kwargs)
+        baseline = None
+        for name, kwargs in OPTIONS:
+            def load(kwargs=kwargs):
+                return loads(text, fmt=FMT_TEXT, engine="fast", **kwargs)
+
+            assert load() == workload.value
+            seconds = best(load, args.repeat)
+            size = kept(load)
+            baseline = baseline or size
+            print("{:<14}{:<13}{:>9.4f}{:>12.1f}{:>7.0%}".format(
+                workload.name, name, seconds, size / 1024, size / baseline))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Throughput of load_many over a directory of generated .strings files.
+
+    python benchmarks/many.py [--files N] [--entries N]
+
+Compares a plain loop over load_path with load_many on thread and process
+pools of 1 up to os.cpu_count() workers. Each file has up to twice `--entries`
+entries.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from text_plistlib import load_many
+from text_plistlib.plistlib import FMT_TEXT, dumps, load_path
+
+from corpus import flat_strings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--entries", type=int, default=2000)
+    args = parser.parse_args()
+    files, entries = args.files, args.entries
+    options = {"engine": "fast", "fmt": FMT_TEXT}
+    with tempfile.TemporaryDirectory() as d:
+        paths = []
+        for i in range(files):
+            rng = random.Random(i)
+            table = flat_strings(rng, rng.randrange(entries // 10, entries * 2))
+            path = os.path.join(d, "%d.strings" % i)
+            with open(path, "wb") as f:
+                f.write(dumps(table, strings=True))
+            paths.append(path)
+        total = sum(os.path.getsize(p) for p in paths)
+        start = time.perf_counter()
+        for path in paths:
+            load_path(path, **options)
+        serial = time.perf_counter() - start
+        print("serial          {t:7.3f} s {r:6.1f} MB/s".format(t=serial, r=total / serial / 1e6))
+        workers = 1
+        while True:
+            for executor in ("thread", "process"):
+                start = time.perf_counter()
+                for _, value in load_many(paths, workers=workers, executor=executor, **options):
+                    if isinstance(value, Exception):
+                        raise value
+                t = time.perf_counter() - start
+                print("{e:<8} x{w:<4}  {t:7.3f} s {r:6.1f} MB/s  {s:4.2f}x".format(
+                    e=executor, w=workers, t=t, r=total / t / 1e6, s=serial / t))
+            if workers >= (os.cpu_count() or 1):
+                break
+            workers = min(workers * 2, os.cpu_count() or 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Loading and dumping long arrays of typed numbers, as lists and as arrays.
+
+    python benchmarks/numbers.py [--count N] [--seed N] [--repeat R]
+
+The document is one array of `<*I...>` and one of `<*R...>`, as in point
+data. It is loaded with the fast engine as it is and with
+`numeric_arrays=True`, then dumped back from what was loaded. "Kept" is as
+in `intern.py`.
+"""
+import argparse
+import random
+
+from text_plistlib.plistlib import FMT_TEXT, dumps, loads
+
+from intern import best, kept
+
+
+def points(rng, n):
+    return {
+        "ids": [rng.randrange(-(1 << 40), 1 << 40) for _ in range(n)],
+        "xs": [rng.uniform(-180, 180) for _ in range(n)],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--count", type=int, default=500000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    text = dumps(points(random.Random(args.seed), args.count))
+    print("{:<9}{:>9}{:>9}{:>12}{:>8}".format("as", "load s", "dump s", "kept KiB", "kept"))
+    baseline = None
+    for name, kwargs in [("lists", {}), ("arrays", {"numeric_arrays": True})]:
+        def load(kwargs=kwargs):
+            return loads(text, fmt=FMT_TEXT, engine="fast", **kwargs)
+
+        value = load()
+        assert dumps(value) == text
+        load_s = best(load, args.repeat)
+        dump_s = best(lambda: dumps(value), args.repeat)
+        size = kept(load)
+        baseline = baseline or size
+        print("{:<9}{:>9.4f}{:>9.4f}{:>12.1f}{:>7.0%}".format(name, load_s, dump_s, size / 1024, size / baseline))
+
+
+if __name__ == "__main__":
+    main()
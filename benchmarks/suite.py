@@ -0,0 +1,179 @@
+"""
+Load and dump throughput and peak memory over the synthetic corpus.
+
+    python benchmarks/suite.py [--scale S] [--seed N] [--repeat R]
+                               [--engines fast,lazy,tatsu] [--output FILE]
+                               [--baseline FILE [--threshold X]]
+
+Each workload from `corpus.py` is written and read back with text_plistlib,
+and with the standard library's XML and binary formats for comparison. Times
+are the best of `repeat` runs; peak memory is measured in one more run under
+tracemalloc. The "lazy" engine only indexes the document, since lazy
+containers are parsed when accessed.
+
+A table goes to stderr, and the results go to `output` (stdout by default) as
+JSON. With `baseline`, results more than `threshold` times slower than the
+matching ones in an earlier JSON file are listed, and the exit status is 1 if
+there are any.
+"""
+import argparse
+import json
+import platform
+import plistlib
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import text_plistlib
+from text_plistlib.plistlib import FMT_TEXT, dumps, loads
+
+from corpus import corpus
+
+STDLIB_FORMATS = {"xml": plistlib.FMT_XML, "binary": plistlib.FMT_BINARY}
+
+
+def _stdlib_value(value):
+    # The stdlib wants naive datetimes, which it takes to be UTC.
+    if isinstance(value, list) and value and isinstance(value[0], datetime):
+        return [d.astimezone(timezone.utc).replace(tzinfo=None) for d in value]
+    return value
+
+
+def measure(func, repeat):
+    """Run `func`. Returns (best seconds, peak traced bytes, result)."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return min(times), peak, result
+
+
+def cases(workload, engines):
+    """Yield (format, operation, engine, func, nbytes) for one workload."""
+    text = dumps(workload.value, **workload.dump_kwargs)
+    yield "text", "dumps", None, lambda: dumps(workload.value, **workload.dump_kwargs), len(text)
+    for engine in engines:
+        if engine == "lazy":
+            kwargs = {"lazy": True}
+        else:
+            kwargs = {"engine": engine}
+        yield "text", "loads", engine, lambda kwargs=kwargs: loads(text, fmt=FMT_TEXT, **kwargs), len(text)
+    value = _stdlib_value(workload.value)
+    for name, fmt in STDLIB_FORMATS.items():
+        try:
+            data = plistlib.dumps(value, fmt=fmt)
+        except (TypeError, ValueError, OverflowError, RecursionError) as e:
+            yield name, "dumps", None, e, 0
+            continue
+        yield name, "dumps", None, lambda fmt=fmt: plistlib.dumps(value, fmt=fmt), len(data)
+        yield name, "loads", None, lambda data=data: plistlib.loads(data), len(data)
+
+
+def run(scale, seed, repeat, engines):
+    results = []
+    for workload in corpus(scale, seed):
+        for fmt, operation, engine, func, nbytes in cases(workload, engines):
+            entry = {
+                "workload": workload.name,
+                "format": fmt,
+                "operation": operation,
+                "engine": engine,
+                "bytes": nbytes,
+            }
+            if isinstance(func, Exception):
+                entry["error"] = type(func).__name__
+            else:
+                try:
+                    seconds, peak, _ = measure(func, repeat)
+                except (RecursionError, text_plistlib.plistlib.InvalidFileException) as e:
+                    entry["error"] = type(e).__name__
+                else:
+                    entry["seconds"] = seconds
+                    entry["mb_per_s"] = nbytes / seconds / 1e6 if seconds else None
+                    entry["peak_bytes"] = peak
+            results.append(entry)
+            report(entry)
+    return results
+
+
+def report(entry):
+    if "error" in entry:
+        detail = entry["error"]
+    else:
+        detail = "{s:9.4f} s {t:8.1f} MB/s {m:10.1f} KiB peak".format(
+            s=entry["seconds"], t=entry["mb_per_s"] or 0, m=entry["peak_bytes"] / 1024
+        )
+    print(
+        "{workload:<14}{format:<7}{operation:<6}{engine:<6}{bytes:>10} B  {detail}".format(
+            detail=detail, **dict(entry, engine=entry["engine"] or "")
+        ),
+        file=sys.stderr,
+    )
+
+
+def _key(entry):
+    return entry["workload"], entry["format"], entry["operation"], entry["engine"]
+
+
+def regressions(results, baseline, threshold):
+    """Results more than `threshold` times slower than in `baseline`."""
+    old = {_key(e): e for e in baseline["results"] if "seconds" in e}
+    slower = []
+    for entry in results:
+        before = old.get(_key(entry))
+        if before is not None and "seconds" in entry:
+            ratio = entry["seconds"] / before["seconds"]
+            if ratio > threshold:
+                slower.append((entry, ratio))
+    return slower
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--engines", default="fast,lazy")
+    parser.add_argument("--output")
+    parser.add_argument("--baseline")
+    parser.add_argument("--threshold", type=float, default=1.25)
+    args = parser.parse_args()
+    engines = [e for e in args.engines.split(",") if e]
+    results = run(args.scale, args.seed, args.repeat, engines)
+    document = {
+        "meta": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "scale": args.scale,
+            "seed": args.seed,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(document, f, indent=1)
+    else:
+        json.dump(document, sys.stdout, indent=1)
+        print()
+    if args.baseline:
+        with open(args.baseline) as f:
+            slower = regressions(results, json.load(f), args.threshold)
+        for entry, ratio in slower:
+            key = "/".join(filter(None, _key(entry)))
+            print("slower: {k} {r:.2f}x".format(k=key, r=ratio), file=sys.stderr)
+        if slower:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+
+import text_plistlib
+from text_plistlib import adump, aload, aloads
+
+VALUE = {"k%d" % i: ["v", i, {"x": b"\x00" * 8}] for i in range(500)}
+
+
+class SlowStream:
+    """An async stream that holds on to each write for a moment."""
+
+    def __init__(self):
+        self.chunks = []
+
+    async def write(self, data):
+        await asyncio.sleep(0.001)
+        self.chunks.append(data)
+
+
+def test_aload():
+    data = text_plistlib.plistlib.dumps(VALUE)
+
+    async def main():
+        reader = asyncio.StreamReader()
+        reader.feed_data(data)
+        reader.feed_eof()
+        assert await aload(reader, chunk_size=1000, engine="fast") == VALUE
+        with ThreadPoolExecutor(1) as pool:
+            assert await aloads(data, executor=pool, engine="fast") == VALUE
+
+    asyncio.run(main())
+
+
+def test_adump():
+    expected = text_plistlib.plistlib.dumps(VALUE)
+
+    async def main():
+        stream = SlowStream()
+        await adump(VALUE, stream, buffer_size=1024, max_pending=2)
+        assert b"".join(stream.chunks) == expected
+        assert len(stream.chunks) >= len(expected) // 1024
+        with ProcessPoolExecutor(1) as pool:
+            stream = SlowStream()
+            await adump(VALUE, stream, executor=pool, buffer_size=4096)
+            assert b"".join(stream.chunks) == expected
+        stream = SlowStream()
+        await adump({"a": 1}, stream, fmt=text_plistlib.plistlib.FMT_XML)
+        assert b"<integer>1</integer>" in b"".join(stream.chunks)
+        with pytest.raises(TypeError):
+            await adump({"a": object()}, SlowStream())
+        task = asyncio.ensure_future(adump(VALUE, SlowStream(), buffer_size=64, max_pending=1))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(main())
@@ -0,0 +1,125 @@
+import os
+from array import array
+from collections import OrderedDict
+from types import MappingProxyType
+
+import pytest
+
+import text_plistlib
+from text_plistlib import CachedLoader, DiskCache
+
+
+def touch(path, data, mtime_ns):
+    path.write_bytes(data)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_hits_and_changes(tmp_path):
+    path = tmp_path / "a.strings"
+    touch(path, b"a = (1, 2);", 10**18)
+    loader = CachedLoader()
+    first = loader.load(path, fmt=text_plistlib.plistlib.FMT_TEXT, engine="fast")
+    assert first == {"a": ["1", "2"]}
+    assert loader.load(path, fmt=text_plistlib.plistlib.FMT_TEXT, engine="fast") is first
+    ordered = loader.load(path, fmt=text_plistlib.plistlib.FMT_TEXT, engine="fast", dict_type=OrderedDict)
+    assert isinstance(ordered, OrderedDict)
+    touch(path, b"a = (1, 3);", 10**18)  # same size and time: still cached
+    assert loader.load(path, fmt=text_plistlib.plistlib.FMT_TEXT, engine="fast") is first
+    touch(path, b"a = (1, 3);", 10**18 + 1)
+    assert loader.load(path, fmt=text_plistlib.plistlib.FMT_TEXT, engine="fast") == {"a": ["1", "3"]}
+    assert loader.info() == (2, 3, 0, 2, 22)
+    loader.invalidate(path)
+    assert loader.info().entries == 0
+
+
+def test_eviction(tmp_path):
+    loader = CachedLoader(max_entries=2, max_bytes=25)
+    for i in range(3):
+        touch(tmp_path / ("%d.strings" % i), b"a = b;", 10**18)
+        loader.load(tmp_path / ("%d.strings" % i))
+    assert loader.info() == (0, 3, 1, 2, 12)
+    loader.load(tmp_path / "1.strings")
+    touch(tmp_path / "big.strings", b"a = 0123456789;", 10**18)
+    loader.load(tmp_path / "big.strings")
+    assert loader.info() == (1, 4, 2, 2, 21)
+    loader.load(tmp_path / "1.strings")
+    assert loader.info().hits == 2
+
+
+def test_modes(tmp_path):
+    path = tmp_path / "a.plist"
+    touch(path, b"{ a = (b, { c = d; }); }", 10**18)
+    loader = CachedLoader(mode="copy")
+    value = loader.load(path, engine="fast")
+    value["a"][1]["c"] = "changed"
+    assert loader.load(path, engine="fast") == {"a": ["b", {"c": "d"}]}
+    frozen = CachedLoader(mode="frozen").load(path)
+    assert isinstance(frozen, MappingProxyType) and frozen["a"] == ("b", {"c": "d"})
+    with pytest.raises(TypeError):
+        frozen["a"][1]["c"] = "changed"
+    with pytest.raises(ValueError):
+        CachedLoader(mode="locked")
+    touch(path, b"{ n = (<*I1>, <*I2>); b = <00>; t = ({ a = <*I1>; }, { a = <*I2>; }); }", 10**18 + 1)
+    options = dict(engine="fast", numeric_arrays=True, columns=["t"], data_type=bytearray)
+    loader = CachedLoader(mode="copy")
+    value = loader.load(path, **options)
+    value["n"].append(9)
+    value["b"].append(1)
+    value["t"]["a"].append(3)
+    value = loader.load(path, **options)
+    assert value["n"] == array("q", [1, 2]) and value["b"] == b"\0" and value["t"]["a"] == array("q", [1, 2])
+    assert isinstance(value["t"], text_plistlib.Columns)
+    frozen = CachedLoader(mode="frozen").load(path, **options)
+    assert frozen["n"] == (1, 2) and type(frozen["b"]) is bytes
+    assert frozen["t"] == ({"a": 1}, {"a": 2}) and isinstance(frozen["t"][0], MappingProxyType)
+    assert text_plistlib.plistlib.dumps(frozen) == text_plistlib.plistlib.dumps(loader.load(path, **options))
+
+
+def test_disk(tmp_path):
+    path = tmp_path / "a.plist"
+    data = b"{ b = <*U3>; a = <*D2006-01-02 15:04:05 -0700>; c = <dead>; d = <*N>; }"
+    touch(path, data, 10**18)
+    kwargs = dict(engine="fast", dict_type=OrderedDict)
+    expected = text_plistlib.plistlib.loads(data, **kwargs)
+    disk = DiskCache(tmp_path / "cache")
+    assert disk.load(path, **kwargs) == expected
+    for _ in range(2):
+        value = DiskCache(tmp_path / "cache").load(path, **kwargs)
+        assert value == expected and list(value) == ["b", "a", "c", "d"]
+        assert value["a"].utcoffset() == expected["a"].utcoffset()
+    touch(path, data, 10**18 + 1)  # touched: hashed again, not parsed
+    assert disk.load(path, **kwargs) == expected
+    copy = tmp_path / "copy.plist"
+    touch(copy, data, 10**18)
+    assert disk.load(copy, **kwargs) == expected
+    assert disk.info() == (0, 2, 1)
+    assert isinstance(disk.load(path, engine="fast"), dict) and disk.info().misses == 2
+    for entry in (tmp_path / "cache").glob("*.pickle"):
+        entry.write_bytes(b"garbage")
+    touch(path, b"x = y;", 10**18 + 2)
+    loader = CachedLoader(disk=disk)
+    assert loader.load(path, **kwargs) == {"x": "y"}
+    assert loader.load(path, **kwargs) == {"x": "y"} and loader.info().hits == 1
+    with pytest.raises(ValueError):
+        disk.load(path, lazy=True)
+    touch(path, b"x = <dead>;", 10**18 + 3)
+    for _ in range(2):  # memoryviews cannot be pickled, so they are parsed every time
+        value = disk.load(path, engine="fast", data_type=memoryview)
+        assert isinstance(value["x"], memoryview) and value["x"] == b"\xde\xad"
+    assert disk.info().misses == 5
+
+
+def test_unhashable_options(tmp_path):
+    path = tmp_path / "a.plist"
+    touch(path, b"{ t = ({ a = <*I1>; }, { a = <*I2>; }); }", 10**18)
+    loader = CachedLoader()
+    for options in ({"columns": ["t"]}, {"columns": [("t",)]}, {"intern_keys": True, "intern_table": {}}):
+        loader.load(path, engine="fast", **options)
+        loader.load(path, engine="fast", **options)
+    assert loader.info()[:2] == (4, 2)
+    assert text_plistlib.load_cached(path, columns=["t"])["t"].rows == 2
+    disk = DiskCache(tmp_path / "cache")
+    table = {}
+    for columns in (["t"], [("t",)]):
+        disk.load(path, engine="fast", columns=columns, intern_keys=True, intern_table=table)
+    assert disk.info() == (1, 0, 1)
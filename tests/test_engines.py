@@ -0,0 +1,469 @@
+import os
+import sys
+from array import array
+from collections import OrderedDict
+from collections.abc import Mapping, Sequence
+from datetime import datetime, timedelta, timezone
+from io import BytesIO
+
+import pytest
+
+import text_plistlib.plistlib
+from text_plistlib import TextPlistParser
+from text_plistlib.dates import FORMAT, format_date, parse_date
+
+self_path = os.path.dirname(os.path.realpath(__file__))
+
+# Documents both engines agree on. The tatsu engine returns arrays as tuples
+# (see `normalize`), and mishandles floats, so those are covered below.
+CORPUS = [
+    b"",
+    b"AString",
+    b'"quoted string"',
+    b"foo;",
+    b'"a" = "b"; c; d = e;',
+    b"{ a = b; }",
+    b'{ "a" = (1, 2, 3); b = {}; c = (); }',
+    b"(a, (b, (c, {d = e;})))",
+    b"{ a = <*I3>; c = <*BY>; d = <*BN>; e = <*N>; }",
+    b"{ CF$UID = <*I3>; }",
+    b"CF$UID = <*I3>;",
+    b"{ a = { CF$UID = <*I12>; }; }",
+    b"<*D2006-01-02 15:04:05 -0700>",
+    b'<*D"2006-01-02 15:04:05 +0000">',
+    b"<>",
+    b"<de>",
+    b"<0a0b0c0d 0e0f>",
+    b"< de ad /* > */ be\nef >",
+    b"<[]>",
+    b"<[TG9yZW1JcHN1bQo=]>",
+    b'/* comment */ { a = b; // eol\n c = "d"; }',
+    b'"line\\nbreak\\ttab"',
+    b'"\\"\\\\\\101\\x41\\U00e9\\ud83d\\ude00\\q\\u\\x4"',
+    b'" spaced // not a comment /* nor this */ "',
+    b"<* I 3 >",
+    "{ \"caf\u00e9\" = \"\u00fcber\"; }".encode("utf-8"),
+]
+
+
+def normalize(value):
+    if isinstance(value, (list, tuple)):
+        return [normalize(v) for v in value]
+    if isinstance(value, dict):
+        return {k: normalize(v) for k, v in value.items()}
+    return value
+
+
+def loads(data, **kwargs):
+    return text_plistlib.plistlib.loads(
+        data, fmt=text_plistlib.plistlib.FMT_TEXT, **kwargs
+    )
+
+
+@pytest.mark.parametrize("data", CORPUS)
+def test_engines_agree(data):
+    assert loads(data, engine="fast") == normalize(loads(data, engine="tatsu"))
+
+
+def test_fast_files():
+    # nullable.plist is missing its last ';'
+    for name in ("extension.strings", "hex.plist", "oneval.plist"):
+        with open(os.path.join(self_path, name), "rb") as f:
+            assert TextPlistParser(engine="fast").parse(f) is not None
+
+
+def test_fast_values():
+    d = loads(open(os.path.join(self_path, "extension.strings"), "rb").read(), engine="fast")
+    assert d["loremIpsum"] == "A story about the good, \n the bad \x00, and the ugly ."
+    assert d["hex"] == d["hex_space"] == b"\xde\xad\xbe\xef"
+    assert d["date"] == datetime(2006, 1, 2, 15, 4, 5, tzinfo=timezone(timedelta(hours=-7)))
+    assert d["array"] == ["1", "2", "3"]
+    assert loads(b"(<*N>, 3, )", engine="fast") == [None, "3"]
+    assert loads(b"(<*R1.5>, <*R-2e3>, <*Rinf>)", engine="fast") == [1.5, -2e3, float("inf")]
+    assert loads(b'"\\"\\\\\\101\\x41\\U00e9\\ud83d\\ude00\\q"', engine="fast") == '"\\AA\u00e9\U0001f600q'
+    assert loads(b"{ a = <*U3>; }", engine="fast") == {"a": text_plistlib.plistlib.UID(3)}
+
+
+def test_escapes():
+    text = "".join(map(chr, range(0x80))) + "\u00e9\U0001f600"
+    data = text_plistlib.plistlib.dumps({"k": text}, fmt=text_plistlib.plistlib.FMT_TEXT)
+    for engine in ("fast", "tatsu"):
+        assert loads(data, engine=engine) == {"k": text}
+    # lone surrogates stay as they are
+    assert loads(b'"\\ud83d \\ude00"', engine="fast") == "\ud83d \ude00"
+
+
+def test_fast_dict_type():
+    d = loads(b"b = 1; a = 2;", engine="fast", dict_type=OrderedDict)
+    assert isinstance(d, OrderedDict) and list(d) == ["b", "a"]
+    assert loads(b"{ CF$UID = <*I3>; }", engine="fast", cfuid=False) == {"CF$UID": 3}
+
+
+@pytest.mark.parametrize("kwargs", [{"engine": "fast"}, {"engine": "tatsu"}, {"lazy": True}])
+def test_intern(kwargs):
+    data = b'( { name = "first"; state = enabled; }, { name = "second"; state = "enabled"; } )'
+    for source in (data, data.decode("ascii")):
+        a, b = loads(source, intern_keys=True, intern_values=True, **kwargs)
+        assert [k for k in a] == [k for k in b] and all(x is y for x, y in zip(a, b))
+        assert a["state"] is b["state"]
+        a, b = loads(source, intern_keys=True, intern_values=5, **kwargs)
+        assert all(x is y for x, y in zip(a, b)) and a["state"] is not b["state"]
+        a, b = loads(source, **kwargs)
+        assert a["state"] is not b["state"]
+    table = {}
+    first = loads(b"{ shared_key = 1; }", intern_keys=True, intern_table=table, **kwargs)
+    second = loads(b"{ shared_key = 2; }", intern_keys=True, intern_table=table, **kwargs)
+    assert next(iter(first)) is next(iter(second)) is table["shared_key"]
+
+
+def test_intern_strings():
+    data = b'"key_one" = "enabled"; "key_two" = "enabled"; n = (enabled);'
+    d = text_plistlib.plistlib.loads_strings(data, intern_values=True)
+    assert d["key_one"] is d["key_two"] is d["n"][0]
+    events = list(TextPlistParser(intern_keys=True).iterparse(BytesIO(b"({ key_x = 1; }, { key_x = 2; })")))
+    keys = [v for e, v in events if e == "key"]
+    assert keys[0] is keys[1]
+
+
+TABLE = b"""{
+    rows = ( { id = <*I1>; name = first; score = <*R2>; }, { id = <*I3>; name = "second"; score = <*R3>; } );
+    nested = { more = ( { flag; }, { flag = <*BY>; } ); };
+    mixed = ( { a = 1; }, { b = 2; } );
+    deeper = ( { a = (1); } );
+    empty = ();
+}"""
+
+
+@pytest.mark.parametrize("engine", ["fast", "tatsu"])
+def test_columns(engine):
+    paths = ["rows", ("nested", "more"), "mixed", "deeper", "empty", ("missing", "path")]
+    for source in (TABLE, TABLE.decode("ascii")):
+        d = loads(source, engine=engine, columns=paths)
+        rows = d["rows"]
+        assert isinstance(rows, text_plistlib.Columns) and rows.rows == 2
+        assert rows["id"] == array("q", [1, 3]) and rows["score"] == array("d", [2.0, 3.0])
+        assert rows["name"] == ["first", "second"]
+        assert d["nested"]["more"] == {"flag": [None, True]}
+        assert list(rows.iter_rows()) == normalize(loads(source, engine=engine))["rows"]
+        for key in ("mixed", "deeper", "empty"):
+            assert not isinstance(d[key], text_plistlib.Columns)
+    top = b"( { a = <*I1>; }, { a = <*I2>; } )"
+    assert loads(top, engine="fast", columns=[()]) == {"a": array("q", [1, 2])}
+    with pytest.raises(text_plistlib.plistlib.InvalidFileException, match="nested deeper than 1 levels"):
+        loads(top, engine="fast", columns=[()], max_depth=1)
+    with pytest.raises(text_plistlib.plistlib.InvalidFileException, match=r"\(1:20\) expecting ',' or '\)'"):
+        loads(b"{ t = ( { a = 1; } { a = 2; } ); }", engine="fast", columns=["t"])
+    uids = b'{ t = ( { a = { CF$UID = <*I3>; }; }, { a = { "CF$UID" = <*I4>; }; } ); }'
+    UID = text_plistlib.plistlib.UID
+    assert loads(uids, engine=engine, columns=["t"])["t"] == {"a": [UID(3), UID(4)]}
+    d = loads(uids, engine=engine, columns=["t"], cfuid=False)
+    assert not isinstance(d["t"], text_plistlib.Columns)
+    repeated = b"{ t = ( { a = <*I1>; b = x; a = <*I2>; }, { a = <*I3>; b = y; b = z; } ); }"
+    assert loads(repeated, engine=engine, columns=["t"])["t"] == {"a": array("q", [2, 3]), "b": ["x", "z"]}
+    other = b"{ t = ( { a = { CF$UID = <*I3>; }; }, { a = { CF$UID = x; }; } ); }"
+    assert not isinstance(loads(other, engine=engine, columns=["t"])["t"], text_plistlib.Columns)
+    with pytest.raises(ValueError):
+        TextPlistParser(array_type="pandas")
+
+
+def test_columns_numpy():
+    numpy = pytest.importorskip("numpy")
+    d = loads(TABLE, engine="fast", columns=["rows"], array_type="numpy")
+    assert isinstance(d["rows"]["id"], numpy.ndarray) and d["rows"]["id"].tolist() == [1, 3]
+    assert text_plistlib.plistlib.loads(text_plistlib.plistlib.dumps(d)) == loads(TABLE, engine="fast")
+
+
+NUMBERS = b"""{
+    ints = ( <*I1>, <* I "-2" >, <*I3>, );
+    reals = ( <*R1>, <*R2>, /* <*R9> */ <*R3> // <*R9> )
+    );
+    mixed = ( <*I1>, <*R2> );
+    strings = ( 1, 2 );
+    big = ( <*I99999999999999999999> );
+    empty = ();
+    nested = ( ( <*I4> ), { a = ( <*R5> ); } );
+}"""
+
+
+@pytest.mark.parametrize("engine", ["fast", "tatsu"])
+def test_numeric_arrays(engine):
+    data = NUMBERS if engine == "fast" else NUMBERS.replace(b'<* I "-2" >', b"<*I2>").replace(b"<*I3>, )", b"<*I3> )")
+    for source in (data, data.decode("ascii")):
+        d = loads(source, engine=engine, numeric_arrays=True)
+        assert d["ints"] == array("q", [1, -2 if engine == "fast" else 2, 3])
+        assert d["reals"] == array("d", [1.0, 2.0, 3.0])
+        assert d["nested"][0] == array("q", [4]) and d["nested"][1]["a"] == array("d", [5.0])
+        for key in ("mixed", "strings", "big", "empty"):
+            assert normalize(d[key]) == normalize(loads(source, engine=engine)[key])
+    for bad in (b"(<*I1> <*I2>)", b"(<*I1>,,<*I2>)", b"(<*I1>, <*I>)", b"(<*R1>, <*R2e>)", b"(<*I1>"):
+        with pytest.raises(text_plistlib.plistlib.InvalidFileException):
+            loads(bad, engine="fast", numeric_arrays=True)
+    with pytest.raises(text_plistlib.plistlib.InvalidFileException, match="nested deeper"):
+        loads(b"{ a = (<*I1>); }", engine="fast", numeric_arrays=True, max_depth=1)
+    # A `)` or `,` in a line comment neither ends the array nor separates numbers.
+    commented = {
+        b"{ a = ((<*I1>, // ) , (\n a)); }": [[1, "a"]],
+        b"{ a = (<*I1>, // )\n a); }": [1, "a"],
+        b"{ a = (<*R1.5> ,// )\n<*I-2>); }": [1.5, -2],
+        b"{ a = (<*I1>, // ), x\n <*I2>); }": array("q", [1, 2]),
+        b"{ a = (<*R1> /* ) , */, <*R2>, // )\n); }": array("d", [1.0, 2.0]),
+    }
+    for source, expected in commented.items():
+        assert loads(source, engine="fast", numeric_arrays=True)["a"] == expected
+        assert normalize(loads(source, engine="fast")["a"]) == normalize(list(expected))
+
+
+def test_numeric_arrays_numpy():
+    numpy = pytest.importorskip("numpy")
+    d = loads(NUMBERS, engine="fast", numeric_arrays=True, array_type="numpy")
+    assert isinstance(d["reals"], numpy.ndarray) and d["reals"].tolist() == [1.0, 2.0, 3.0]
+    assert text_plistlib.plistlib.loads(text_plistlib.plistlib.dumps(d)) == loads(NUMBERS, engine="fast")
+
+
+@pytest.mark.parametrize("data", [b"{a=b}", b"(a b)", b"a = b", b'"open', b"{a=b;} c", b"(,)", b"<abc>", b"<a b>"])
+def test_fast_errors(data):
+    with pytest.raises(text_plistlib.plistlib.InvalidFileException):
+        loads(data, engine="fast")
+
+
+@pytest.mark.parametrize("data_type", [bytes, bytearray, memoryview])
+def test_data_type(data_type):
+    data = b"{ a = <0001 0203>; b = <[AAECAw==]>; c = (<>, <ff>); }"
+    for kwargs in ({"engine": "fast"}, {"engine": "tatsu"}, {"lazy": True}):
+        d = loads(data, data_type=data_type, **kwargs)
+        values = [d["a"], d["b"], d["c"][0], d["c"][1]]
+        assert all(type(v) is data_type for v in values)
+        assert [bytes(v) for v in values] == [b"\0\1\2\3", b"\0\1\2\3", b"", b"\xff"]
+    d = loads(data, engine="fast", data_type=data_type)
+    assert text_plistlib.plistlib.dumps(d) == text_plistlib.plistlib.dumps(loads(data, engine="fast"))
+    with pytest.raises(ValueError):
+        TextPlistParser(data_type=str).parse_buffer(data)
+
+
+def test_bad_data():
+    blob = os.urandom(1 << 20)
+    for compact in (False, True):
+        text = text_plistlib.plistlib.dumps({"a": blob, "b": blob[:-1]}, compact=compact)
+        assert loads(text, engine="fast") == {"a": blob, "b": blob[:-1]}
+    with pytest.raises(text_plistlib.plistlib.InvalidFileException, match=r"\(2:7\) invalid hexdata"):
+        loads(b"{\n a = <0a0b0>;\n}", engine="fast")
+    with pytest.raises(text_plistlib.plistlib.InvalidFileException, match=r"\(1:10\) invalid date"):
+        loads(b"{ a = <*D2006-13-02 15:04:05 -0700>; }", engine="fast")
+
+
+@pytest.mark.parametrize("engine", ["fast", "tatsu"])
+def test_dates(engine):
+    spellings = [
+        "2006-01-02 15:04:05 -0700",
+        "2006-01-02 15:04:05 +0000",
+        "0099-12-31 23:59:59 +1359",
+        "2006-01-02 15:04:05 +07:00",
+        "2006-1-2 15:04:05 -0700",
+        "2006-01-02  15:04:05 +0700",
+        "2006-01-02 15:04:05 Z",
+    ]
+    for s in spellings:
+        d = loads("{{ a = <*D{s}>; }}".format(s=s), engine=engine)["a"]
+        assert d == datetime.strptime(s, FORMAT) and d.utcoffset() == datetime.strptime(s, FORMAT).utcoffset()
+    for s in ("2006-01-02 15:04:05 -2400", "2006-02-30 15:04:05 -0700", "2006-01-02 15:04:60 +0000"):
+        with pytest.raises(ValueError):
+            parse_date(s)
+    zones = [None, timezone.utc, timezone(timedelta(hours=-7)), timezone(timedelta(hours=5, seconds=30))]
+    for tz in zones:
+        for d in (datetime(2006, 1, 2, 15, 4, 5, tzinfo=tz), datetime(99, 12, 31, 23, 59, tzinfo=tz)):
+            for utc in (True, False):
+                expected = (d.astimezone(timezone.utc) if utc else d).strftime(FORMAT)
+                assert format_date(d, utc) == expected
+
+
+def build(events):
+    """Rebuild a value from iterparse events."""
+    stack, keys = [[]], []
+    for event, value in events:
+        if event in ("start_dict", "start_array"):
+            stack.append({} if event == "start_dict" else [])
+        elif event == "key":
+            keys.append(value)
+            continue
+        else:
+            if event in ("end_dict", "end_array"):
+                value = stack.pop()
+            top = stack[-1]
+            if isinstance(top, dict):
+                top[keys.pop()] = value
+            else:
+                top.append(value)
+    return stack[0][0]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 7, 65536])
+def test_iterparse(chunk_size):
+    for name in ("extension.strings", "hex.plist", "oneval.plist"):
+        with open(os.path.join(self_path, name), "rb") as f:
+            events = text_plistlib.plistlib.iterparse(f, chunk_size=chunk_size)
+            result = build(events)
+        with open(os.path.join(self_path, name), "rb") as f:
+            assert result == TextPlistParser(engine="fast").parse(f)
+    data = "x = (\"café\", {}, ());".encode("utf-8")
+    events = list(text_plistlib.plistlib.iterparse(BytesIO(data), chunk_size=chunk_size))
+    assert events == [
+        ("start_dict", None),
+        ("key", "x"),
+        ("start_array", None),
+        ("value", "café"),
+        ("start_dict", None),
+        ("end_dict", None),
+        ("start_array", None),
+        ("end_array", None),
+        ("end_array", None),
+        ("end_dict", None),
+    ]
+    # Comments before quoted strings cut off at a chunk boundary.
+    for data in (b'a = // x\n"b";', b'a = //;\n"b";', b'a = /* x */ "b";', b'(//\n"b")'):
+        events = text_plistlib.plistlib.iterparse(BytesIO(data), chunk_size=chunk_size)
+        assert build(events) == loads(data, engine="fast")
+    data = b"".join(b'// entry %d\n"key%d" = "value %d";\n' % (i, i, i) for i in range(30000))
+    events = text_plistlib.plistlib.iterparse(BytesIO(data), chunk_size=chunk_size)
+    assert build(events) == {"key%d" % i: "value %d" % i for i in range(30000)}
+
+
+def test_buffers(tmp_path):
+    with open(os.path.join(self_path, "extension.strings"), "rb") as f:
+        data = f.read()
+    expected = TextPlistParser(engine="fast").parse_buffer(data.decode("utf-8"))
+    assert loads(data, engine="fast") == expected
+    assert loads(b"\xef\xbb\xbf" + data, engine="fast") == expected
+    assert loads(memoryview(data), engine="fast") == expected
+    path = tmp_path / "extension.strings"
+    path.write_bytes(data)
+    load_path = text_plistlib.plistlib.load_path
+    assert load_path(path, mmap=True, engine="fast", fmt=text_plistlib.plistlib.FMT_TEXT) == expected
+    (tmp_path / "empty.strings").write_bytes(b"")
+    assert load_path(tmp_path / "empty.strings", mmap=True, fmt=text_plistlib.plistlib.FMT_TEXT) == {}
+    with pytest.raises(UnicodeDecodeError):
+        loads('a = "é";'.encode("utf-8"), engine="fast", encoding="ascii")
+
+
+def test_lazy():
+    with open(os.path.join(self_path, "extension.strings"), "rb") as f:
+        data = f.read()
+    expected = loads(data, engine="fast")
+    lazy = loads(data, lazy=True)
+    assert isinstance(lazy, Mapping) and isinstance(lazy["object"]["a"], Sequence)
+    assert lazy == expected
+    assert lazy.materialize() == expected
+    data = b'{ a = { CF$UID = <*I3>; }; b = (1, { c = d; }, ()); "x{" = "("; e//f = g; }'
+    lazy = loads(data, lazy=True, dict_type=OrderedDict)
+    assert lazy["a"] == text_plistlib.plistlib.UID(3)
+    assert isinstance(lazy.materialize()["b"][1], OrderedDict)
+    assert lazy == loads(data, engine="fast")
+    assert loads(b"CF$UID = <*I4>;", lazy=True) == text_plistlib.plistlib.UID(4)
+    with pytest.raises(text_plistlib.plistlib.InvalidFileException):
+        loads(b"{ a = (; }", lazy=True)
+
+
+def test_deep():
+    depth = 10 * sys.getrecursionlimit()
+    data = b"(" * depth + b"a" + b")" * depth
+    value = loads(data, engine="fast")
+    for _ in range(depth):
+        (value,) = value
+    assert value == "a"
+    data = b"{ a = " * depth + b"{ CF$UID = <*I1>; }" + b"; }" * depth
+    value = loads(data, lazy=True).materialize()
+    for _ in range(depth):
+        value = value["a"]
+    assert value == text_plistlib.plistlib.UID(1)
+    assert len(list(text_plistlib.plistlib.iterparse(BytesIO(data)))) == 3 * depth + 4
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_max_depth(lazy):
+    assert loads(b"(a, (b, ()))", engine="fast", lazy=lazy, max_depth=3) == ["a", ["b", []]]
+    assert loads(b"a = (b);", engine="fast", lazy=lazy, max_depth=2) == {"a": ["b"]}
+    for data in (b"(a, (b, ((c))))", b"{ a = { b = { c = {}; }; }; d = e; }"):
+        with pytest.raises(text_plistlib.plistlib.InvalidFileException, match="deeper than 3"):
+            loads(data, engine="fast", lazy=lazy, max_depth=3)
+    # The dictionary of a .strings file is a level too.
+    with pytest.raises(text_plistlib.plistlib.InvalidFileException, match="deeper than 1"):
+        loads(b"a = (b);", engine="fast", lazy=lazy, max_depth=1)
+    for data in (b'"a" = "b";', b"a = <*I1>;"):
+        with pytest.raises(text_plistlib.plistlib.InvalidFileException, match="deeper than 0"):
+            loads(data, engine="fast", lazy=lazy, max_depth=0)
+        assert loads(data, engine="fast", lazy=lazy, max_depth=1)["a"] in ("b", 1)
+    with pytest.raises(text_plistlib.plistlib.InvalidFileException, match="deeper than 3"):
+        list(text_plistlib.plistlib.iterparse(BytesIO(b"x = ((());"), max_depth=3))
+
+
+STRINGS = [
+    b'"a" = "b";\n"c" = "d";\n',
+    b'/* "quoted" in a comment */\n"a" = "b"; // "and" here\n"c" = "d";',
+    b'"say \\"hi\\"" = "back\\\\"; "\\\\" = "x\\\\\\"y";',
+    b'a = b; "c" = d; e; "f";',
+    b'"a"="b";"a"="c";"d"/**/=/**/"e"/**/;',
+    b'"a" = "b"; n = <*I3>; "c" = "d"; arr = (1, 2); "e" = "\\U00e9";',
+    b'"a" = "b"; // no newline at the end',
+    b'"a" = "b"',
+    b'"a" = "b"; "c" = ;',
+    b'"a" = "b"; "c" "d";',
+    b'"a" = "b"; //"c" = "d";\n',
+    b'"\0\x01" = "\\"\0\x02"; "two\nlines" = "\\\\";',
+]
+
+
+@pytest.mark.parametrize("data", STRINGS)
+@pytest.mark.parametrize("engine", ["fast", "tatsu"])
+def test_strings(data, engine):
+    scanner = TextPlistParser(engine="fast")._str_scanner()
+    try:
+        expected = scanner.parse(data.decode("utf-8"))
+    except text_plistlib.plistlib.InvalidFileException as e:
+        with pytest.raises(text_plistlib.plistlib.InvalidFileException, match=str(e).split()[0]):
+            text_plistlib.plistlib.loads_strings(data)
+        # tatsu raises its own exceptions
+        with pytest.raises(text_plistlib.plistlib.InvalidFileException if engine == "fast" else Exception):
+            loads(data, engine=engine)
+        return
+    assert text_plistlib.plistlib.loads_strings(data) == expected
+    assert normalize(loads(data, engine=engine)) == expected
+
+
+def test_strings_options():
+    d = text_plistlib.plistlib.loads_strings(b'"b" = "1"; "a" = "2"; "b" = "3";', dict_type=OrderedDict)
+    assert isinstance(d, OrderedDict) and list(d.items()) == [("b", "3"), ("a", "2")]
+    assert text_plistlib.plistlib.loads_strings(b"CF$UID = <*I3>;") == text_plistlib.plistlib.UID(3)
+    with open(os.path.join(self_path, "extension.strings"), "rb") as f:
+        assert text_plistlib.plistlib.load_strings(f) == loads(f.seek(0) or f.read(), engine="fast")
+
+
+def test_entry_lists():
+    # Entry lists whose first values are not strings are scanned as bytes, without decoding them.
+    for data, decoded in ((b'a = { b = c; }; "d" = "e";', False), (b'"a" = "b"; ' * 8 + b"c = { d = e; };", True)):
+        stats = text_plistlib.ParseStats()
+        value = loads(data, engine="fast", stats=stats)
+        assert value == loads(data.decode("ascii"), engine="fast") == normalize(loads(data, engine="tatsu"))
+        assert ("decode" in stats.times) == decoded
+
+
+@pytest.mark.parametrize("engine", ["fast", "tatsu"])
+def test_stats(engine):
+    seen = []
+    stats = text_plistlib.ParseStats(callback=seen.append)
+    data = b'{ a = (b, <*I1>, <*R2>, { c = <00ff>; }); d = <*BY>; e = <*D2006-01-02 15:04:05 -0700>; }'
+    value = loads(data, engine=engine, stats=stats)
+    assert seen == [stats] and stats.parses == 1 and stats.bytes_in == len(data)
+    assert stats.nodes == {"dict": 2, "array": 1, "string": 1, "int": 1, "float": 1, "data": 1, "bool": 1, "date": 1}
+    assert stats.max_depth == 3
+    assert {"parse", "count"} <= set(stats.times) and all(t >= 0 for t in stats.times.values())
+    assert ("semantics" in stats.times and stats.memo_entries > 0) == (engine == "tatsu")
+    assert TextPlistParser(engine=engine, stats=stats).parse(BytesIO(data)) == value
+    assert stats.parses == 2 and stats.bytes_in == 2 * len(data) and stats.nodes["dict"] == 4 and "read" in stats.times
+    stats = text_plistlib.ParseStats()
+    loads(NUMBERS, engine="fast", numeric_arrays=True, stats=stats)
+    assert stats.nodes["int"] >= 3 and stats.nodes["float"] >= 3
+    stats = text_plistlib.ParseStats()
+    assert loads('"a" = "b"; c;', engine=engine, stats=stats) == {"a": "b", "c": None}
+    assert stats.nodes == {"dict": 1, "string": 1, "null": 1} and stats.max_depth == 1
+    stats = text_plistlib.ParseStats()
+    loads(data, lazy=True, stats=stats)
+    assert stats.parses == 1 and not stats.nodes
@@ -0,0 +1,45 @@
+import os
+import subprocess
+import sys
+
+self_path = os.path.dirname(os.path.realpath(__file__))
+
+# Modules that only some features need, and that take a while to import.
+HEAVY = ("tatsu", "text_plistlib.pparser", "asyncio", "concurrent.futures")
+# Modules that compile patterns only parsing needs, and that `import text_plistlib` leaves alone.
+PARSING = ("text_plistlib.scanner", "text_plistlib.lazy", "text_plistlib.strings", "text_plistlib.stats")
+
+
+def import_times(code):
+    """Run `code` under -X importtime. Returns {module: cumulative microseconds}."""
+    env = dict(os.environ, PYTHONPATH=os.path.dirname(self_path))
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        env=env,
+        stderr=subprocess.PIPE,
+        check=True,
+        universal_newlines=True,
+    ).stderr
+    times = {}
+    for line in out.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, name = line[len("import time:"):].split("|")
+            if cumulative.strip().isdigit():
+                times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_light_imports():
+    times = import_times("import text_plistlib")
+    assert not [m for m in times if m.startswith(HEAVY + PARSING)]
+    times = import_times(
+        "import plistlib, text_plistlib;"
+        "text_plistlib.patch(plistlib);"
+        "text_plistlib.plistlib.dumps({'a': [1, b'x']});"
+        "text_plistlib.plistlib.loads(b'a = b;', engine='fast')"
+    )
+    assert not [m for m in times if m.startswith(HEAVY)]
+    times = import_times("import text_plistlib.plistlib as p; p.loads(b'{a = b;}')")
+    assert "tatsu" in times and "asyncio" not in times
+    times = import_times("import text_plistlib; text_plistlib.load_many")
+    assert "concurrent.futures" in times and "tatsu" not in times
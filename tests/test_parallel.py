@@ -0,0 +1,65 @@
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import text_plistlib
+from text_plistlib import load_many
+
+
+@pytest.mark.parametrize("executor", ["process", "thread"])
+def test_load_many(tmp_path, executor):
+    paths = []
+    for i in range(6):
+        path = tmp_path / ("%d.strings" % i)
+        path.write_bytes(b"key = value%d;" % i + b" pad = x;" * i)
+        paths.append(path)
+    broken = tmp_path / "broken.strings"
+    broken.write_bytes(b"a = ;")
+    items = paths[1:] + [(paths[0], {"dict_type": OrderedDict}), broken, tmp_path / "missing"]
+    results = dict(load_many(items, workers=2, executor=executor, engine="fast", fmt=text_plistlib.plistlib.FMT_TEXT))
+    assert set(results) == set(paths) | {broken, tmp_path / "missing"}
+    for i, path in enumerate(paths):
+        assert results[path]["key"] == "value%d" % i
+    assert isinstance(results[paths[0]], OrderedDict) and not isinstance(results[paths[1]], OrderedDict)
+    assert isinstance(results[broken], text_plistlib.plistlib.InvalidFileException)
+    assert isinstance(results[tmp_path / "missing"], FileNotFoundError)
+
+
+def test_load_many_executor(tmp_path):
+    (tmp_path / "a.strings").write_bytes(b"a = b;")
+    with ThreadPoolExecutor(1) as pool:
+        assert list(load_many([tmp_path / "a.strings"], executor=pool, engine="fast")) == [
+            (tmp_path / "a.strings", {"a": "b"})
+        ]
+        assert pool.submit(int, "1").result() == 1  # still usable
+    with pytest.raises(ValueError):
+        list(load_many([], executor="fiber"))
+
+
+@pytest.mark.parametrize("executor", ["process", "thread"])
+def test_loads_parallel(executor):
+    entries = [b'k%d = "v;%d";' % (i % 150, i) for i in range(400)]
+    entries[7] = b'"x;{" = ( a, { b = "c;}"; }, "(" ); /* ; } */ y = <* I 3>; // ;\n'
+    entries[300] = b"s = <[YWJj]>; h = <de ad>; z = { CF$UID = <*I2>; };"
+    body = b"\n".join(entries)
+    for data in (body, b"{\n" + body + b"\n}", "﻿".encode("utf-8") + body):
+        expected = text_plistlib.plistlib.loads(
+            data, fmt=text_plistlib.plistlib.FMT_TEXT, engine="fast", dict_type=OrderedDict
+        )
+        value = text_plistlib.loads_parallel(data, executor=executor, workers=3, shard_size=500, dict_type=OrderedDict)
+        assert isinstance(value, OrderedDict) and list(value.items()) == list(expected.items())
+    assert text_plistlib.loads_parallel(b"CF$UID = <*I3>;" + b" " * 200, shard_size=50) == text_plistlib.plistlib.UID(3)
+    assert text_plistlib.loads_parallel(b"(" + b"a," * 200 + b")", shard_size=50, engine="fast") == ["a"] * 200
+
+
+@pytest.mark.parametrize(
+    "data",
+    [b"a = b;\n" * 100 + b"c = ;" + b"d = e;" * 50, b"{" + b"a = b;" * 100 + b"} x", b"a = b;" * 100 + b"}"],
+)
+def test_loads_parallel_errors(data):
+    with pytest.raises(text_plistlib.plistlib.InvalidFileException) as serial:
+        text_plistlib.plistlib.loads(data, fmt=text_plistlib.plistlib.FMT_TEXT, engine="fast")
+    with pytest.raises(text_plistlib.plistlib.InvalidFileException) as parallel:
+        text_plistlib.loads_parallel(data, executor="thread", shard_size=64)
+    assert str(parallel.value) == str(serial.value)
@@ -0,0 +1,179 @@
+import sys
+from array import array
+from collections import OrderedDict
+from collections.abc import Mapping
+from enum import IntEnum
+from io import BytesIO
+from types import MappingProxyType
+
+import pytest
+
+import text_plistlib.plistlib
+from text_plistlib import TextPlistDialects, TextPlistWriter
+
+
+class CountingIO(BytesIO):
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def write(self, b):
+        self.calls += 1
+        return super().write(b)
+
+
+def test_dumps():
+    assert text_plistlib.plistlib.dumps({"1": [2, 3, 4, None, 5]}) == (
+        b'{\n\t"1" = (\n\t\t<*I2>,\n\t\t<*I3>,\n\t\t<*I4>,\n\t\t"",\n\t\t<*I5>,\n\t);\n}'
+    )
+
+
+def test_buffered():
+    value = {"k%d" % i: {"n": i, "l": ["a", [["b"]]]} for i in range(200)}
+    expected = text_plistlib.plistlib.dumps(value)
+    fp = CountingIO()
+    TextPlistWriter(fp).write(value)
+    assert fp.getvalue() == expected and fp.calls == 1
+    fp = CountingIO()
+    TextPlistWriter(fp, buffer_size=256).write(value)
+    assert fp.getvalue() == expected and len(expected) // 256 - 1 <= fp.calls <= len(expected) // 256 + 1
+    fp = CountingIO()
+    writer = TextPlistWriter(fp)
+    writer.write_value(value)
+    assert fp.getvalue() == expected
+    writer.write_string("x")
+    assert fp.getvalue() == expected + b'"x"'
+
+
+def test_strings():
+    dumps = text_plistlib.plistlib.dumps
+    strings = ["plain", "", "a b", "a.b", "//x", "/*x", "a//b", "123", "café", "\U0001f600"]
+    strings += ["\x00\x01\x07\t\n\x1b\x7f", 'q"b\\s', "01\x001"]
+    value = {s: s for s in strings}
+    for kwargs in ({}, {"bare_strings": True}, {"escape_unicode": True}):
+        out = dumps(value, **kwargs)
+        assert text_plistlib.plistlib.loads(out, engine="fast") == value
+    assert dumps(["a.b", "a b", "//x", ""], bare_strings=True) == b'(\n\ta.b,\n\t"a b",\n\t"//x",\n\t"",\n)'
+    assert dumps("\x01\U0001f600\"", escape_unicode=True) == b'"\\001\\Ud83d\\Ude00\\""'
+
+
+def test_dispatch():
+    class Level(IntEnum):
+        LOW = 1
+
+    class Point:
+        def __init__(self, x, y):
+            self.x, self.y = x, y
+
+    dumps = text_plistlib.plistlib.dumps
+    assert dumps([Level.LOW, OrderedDict(a=b"\x00")]) == b'(\n\t<*I1>,\n\t{\n\t\t"a" = <[AA==\n]>;\n\t},\n)'
+    assert dumps(Point(1, 2), converters={Point: lambda p: [p.x, p.y]}) == b"(\n\t<*I1>,\n\t<*I2>,\n)"
+    fp = BytesIO()
+    writer = TextPlistWriter(fp)
+    writer.register(Mapping, dict)
+    writer.write(MappingProxyType({"a": "b"}))
+    assert fp.getvalue() == b'{\n\t"a" = "b";\n}'
+    with pytest.raises(TypeError):
+        dumps(Point(1, 2))
+
+
+def test_deep():
+    value = []
+    for _ in range(10 * sys.getrecursionlimit()):
+        value = [value]
+    out = text_plistlib.plistlib.dumps(value, indent=b"")
+    assert out.startswith(b"(\n(\n") and out.endswith(b"),\n)")
+    a = []
+    a.append(a)
+    d = {"x": [1, {}]}
+    d["x"][1]["y"] = d
+    for value in (a, d, [[a]]):
+        for kwargs in ({}, {"compact": True}):
+            with pytest.raises(ValueError, match="circular reference"):
+                text_plistlib.plistlib.dumps(value, **kwargs)
+    shared = [1]
+    assert text_plistlib.plistlib.dumps([shared, shared], compact=True) == b"((<*I1>),(<*I1>))"
+
+
+def test_compact():
+    dumps = text_plistlib.plistlib.dumps
+    value = {
+        "n": [1, -2.5, 0.25, 1e20, 3.0],
+        "s": ["a.b", "a b", ""],
+        "d": [b"\x00\x01\x02", b"abcdef", b""],
+        "e": {},
+        "x": [[]],
+    }
+    out = dumps(value, compact=True)
+    assert out == (
+        b'{d=(<000102>,<[YWJjZGVm]>,<>);e={};n=(<*I1>,<*R-2.5>,<*R.25>,<*R1e20>,<*R3>);'
+        b's=(a.b,"a b","");x=(());}'
+    )
+    assert text_plistlib.plistlib.loads(out, engine="fast") == value
+    assert len(out) < len(dumps(value)) * 0.6
+    openstep = dumps(value, compact=True, dialect=TextPlistDialects.OpenStep)
+    assert b"<616263646566>" in openstep and b"n=(1,-2.5,.25,1e20,3)" in openstep
+    assert dumps({"a": None, "b": "c"}, compact=True, strings=True, dialect=TextPlistDialects.PyText) == b"a;b=c;"
+
+
+def test_columns():
+    table = text_plistlib.Columns({"name": ["a", "b"], "id": array("q", [1, 2]), "x": array("d", [0.5, 2.0])})
+    rows = [{"name": "a", "id": 1, "x": 0.5}, {"name": "b", "id": 2, "x": 2.0}]
+    for kwargs in ({}, {"compact": True}, {"sort_keys": False}):
+        assert text_plistlib.plistlib.dumps({"t": table}, **kwargs) == text_plistlib.plistlib.dumps({"t": rows}, **kwargs)
+    assert text_plistlib.plistlib.dumps(text_plistlib.Columns(rows=2), compact=True) == b"({},{})"
+    with pytest.raises(ValueError):
+        text_plistlib.plistlib.dumps(text_plistlib.Columns({"a": [1], "b": [1, 2]}))
+
+
+def test_arrays():
+    value = {"i": array("q", [1, -2]), "r": array("d", [0.5, 1e20, float("inf")]), "e": array("d"), "u": array("u", "hi")}
+    as_lists = {k: list(v) for k, v in value.items()}
+    for kwargs in ({}, {"compact": True}, {"dialect": TextPlistDialects.OpenStep}, {"float_fmt": "{v:.3f}"}):
+        assert text_plistlib.plistlib.dumps(value, **kwargs) == text_plistlib.plistlib.dumps(as_lists, **kwargs)
+    numbers = array("d", range(10000))
+    assert text_plistlib.plistlib.loads(text_plistlib.plistlib.dumps({"n": numbers}), engine="fast") == {"n": list(numbers)}
+
+
+def test_streaming():
+    dumps = text_plistlib.plistlib.dumps
+    Entries = text_plistlib.Entries
+    value = {"b": [1, "x", {"c": None}], "a": [[2.5], []]}
+    for kwargs in ({}, {"compact": True}, {"sort_keys": False}):
+        expected = dumps(value, **kwargs)
+        assert dumps(Entries(iter(value.items())), **kwargs) == expected
+        streamed = Entries((k, (x for x in v)) for k, v in value.items())
+        assert dumps(streamed, **kwargs) == expected
+        assert dumps(MappingProxyType(value), **kwargs) == expected
+    assert dumps(Entries([("b", 1), ("a", 2)], ordered=True), sort_keys=False) == b'{\n\t"b" = <*I1>;\n\t"a" = <*I2>;\n}'
+    with pytest.raises(ValueError):
+        dumps(Entries([("b", 1), ("a", 2)], ordered=True))
+    assert dumps(Entries([(1, 1), ("a", 2)]), sort_keys=False, skipkeys=True) == dumps({"a": 2})
+    assert dumps(Entries([("a", None)], ordered=True), strings=True, dialect=TextPlistDialects.PyText) == b'"a";\n'
+    assert dumps(range(3)) == dumps([0, 1, 2]) and dumps(map(str, range(2)), compact=True) == b"(0,1)"
+    with pytest.raises(TypeError):
+        dumps({"a": {1, 2}})
+
+    # Rows are taken only as the output gets to them.
+    taken = []
+    fp = CountingIO()
+
+    def rows():
+        for i in range(20000):
+            taken.append(fp.calls)
+            yield "row%05d" % i, {"n": i}
+
+    TextPlistWriter(fp, buffer_size=4096).write(Entries(rows(), ordered=True))
+    assert fp.calls > 100 and taken[-1] == fp.calls - 1
+    assert text_plistlib.plistlib.loads(fp.getvalue(), engine="fast") == {"row%05d" % i: {"n": i} for i in range(20000)}
+
+
+def test_stats():
+    stats = text_plistlib.WriteStats()
+    value = {"k%d" % i: [i, 0.5, b"\x00", None] for i in range(100)}
+    fp = CountingIO()
+    TextPlistWriter(fp, buffer_size=256, stats=stats).write(value)
+    assert stats.writes == 1 and stats.bytes_out == len(fp.getvalue()) and stats.write_calls == fp.calls > 1
+    assert stats.nodes == {"dict": 1, "array": 100, "int": 100, "float": 100, "data": 100, "null": 100}
+    assert stats.times["write"] >= stats.times["flush"] > 0
+    assert text_plistlib.plistlib.dumps(value, stats=stats) == fp.getvalue() and stats.writes == 2
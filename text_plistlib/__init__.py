@@ -6,14 +6,60 @@ __all__ = [
     "TextPlistDialects",
     "TextPlistParser",
     "TextPlistWriter",
+    "StringsParser",
+    "Columns",
+    "Entries",
+    "ParseStats",
+    "WriteStats",
+    "CachedLoader",
+    "DiskCache",
+    "load_cached",
+    "load_many",
+    "loads_parallel",
     "patch",
+    "aload",
+    "aloads",
+    "adump",
     "plistlib",
 ]
 
+import importlib
+
 from .impl import (
     TextPlistTypes,
     TextPlistDialects,
     TextPlistParser,
     TextPlistWriter,
 )
+from .columns import Columns
+from .entries import Entries
 from .patch import patch
+from . import plistlib
+
+# These pull in asyncio, concurrent.futures and friends, or compile patterns
+# that plain loads and dumps do not need, so they are imported on first use.
+_LAZY = {
+    "StringsParser": "strings",
+    "ParseStats": "stats",
+    "WriteStats": "stats",
+    "CachedLoader": "cache",
+    "DiskCache": "cache",
+    "load_cached": "cache",
+    "load_many": "parallel",
+    "loads_parallel": "parallel",
+    "aload": "aio",
+    "aloads": "aio",
+    "adump": "aio",
+}
+
+
+def __getattr__(name):
+    if name not in _LAZY:
+        raise AttributeError("module {m!r} has no attribute {n!r}".format(m=__name__, n=name))
+    value = getattr(importlib.import_module("." + _LAZY[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
@@ -0,0 +1,116 @@
+"""
+Coroutines for reading and writing plists on asyncio streams.
+
+Streams are anything with a coroutine `read(n)`, or a `write(data)` that is a
+coroutine or, like `asyncio.StreamWriter`, comes with a coroutine `drain()`.
+Parsing and serializing run on an executor, so the event loop stays free.
+"""
+import asyncio
+import inspect
+from concurrent.futures import Executor, ProcessPoolExecutor
+from functools import partial
+from typing import Optional
+
+from .impl import TextPlistTypes
+from .plistlib import FMT_TEXT, dump, dumps, loads
+
+
+async def _write(stream, data: bytes) -> None:
+    result = stream.write(data)
+    if inspect.isawaitable(result):
+        await result
+    drain = getattr(stream, "drain", None)
+    if drain is not None:
+        await drain()
+
+
+async def aloads(value, *, executor: Optional[Executor] = None, **kwargs) -> TextPlistTypes:
+    """`plistlib.loads` on `executor` (the loop's default one if None)."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, partial(loads, value, **kwargs))
+
+
+async def aload(
+    stream, *, chunk_size: int = 65536, executor: Optional[Executor] = None, **kwargs
+) -> TextPlistTypes:
+    """Read `stream` to the end, `chunk_size` bytes at a time, and parse it with `aloads`."""
+    chunks = []
+    while True:
+        chunk = await stream.read(chunk_size)
+        if not chunk:
+            break
+        chunks.append(chunk)
+    return await aloads(b"".join(chunks), executor=executor, **kwargs)
+
+
+class _Aborted(Exception):
+    pass
+
+
+class _QueueSink:
+    """A file for a worker thread, handing what is written to the event loop."""
+
+    def __init__(self, loop, queue):
+        self.loop = loop
+        self.queue = queue
+        self.aborted = False
+
+    def write(self, data):
+        if self.aborted:
+            raise _Aborted
+        # Blocks the worker while the queue is full.
+        asyncio.run_coroutine_threadsafe(self.queue.put(bytes(data)), self.loop).result()
+        return len(data)
+
+
+async def adump(
+    value: TextPlistTypes,
+    stream,
+    *,
+    executor: Optional[Executor] = None,
+    buffer_size: int = 65536,
+    max_pending: int = 4,
+    **kwargs
+) -> None:
+    """
+    Serialize `value` like `plistlib.dump` on `executor`, writing it to
+    `stream` every `buffer_size` bytes. The writer waits while `max_pending`
+    pieces are still to be written, so a slow stream holds it back instead of
+    filling memory.
+
+    A process pool cannot hand pieces back as they are made, and the XML and
+    binary formats are not written in pieces; then the whole document is made
+    first, and written piece by piece.
+    """
+    loop = asyncio.get_running_loop()
+    if isinstance(executor, ProcessPoolExecutor) or kwargs.get("fmt", FMT_TEXT) != FMT_TEXT:
+        data = await loop.run_in_executor(executor, partial(dumps, value, **kwargs))
+        for i in range(0, len(data), buffer_size):
+            await _write(stream, data[i : i + buffer_size])
+        return
+
+    queue: asyncio.Queue = asyncio.Queue(max_pending)
+    sink = _QueueSink(loop, queue)
+
+    def produce():
+        try:
+            dump(value, sink, buffer_size=buffer_size, **kwargs)
+        finally:
+            if not sink.aborted:
+                asyncio.run_coroutine_threadsafe(queue.put(None), loop).result()
+
+    task = loop.run_in_executor(executor, produce)
+    try:
+        while True:
+            chunk = await queue.get()
+            if chunk is None:
+                break
+            await _write(stream, chunk)
+        await task
+    finally:
+        if not task.done():
+            # We are being cancelled or the stream failed: stop the worker.
+            sink.aborted = True
+            while not queue.empty():
+                queue.get_nowait()
+            await asyncio.wait([task])
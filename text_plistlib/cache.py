@@ -0,0 +1,332 @@
+"""
+Caching parsed plists in memory and on disk.
+
+A `CachedLoader` remembers what each file parsed to, along with the file's
+modification time and size, and only parses again when those change or when
+different options are asked for. A `DiskCache` keeps parsed values in a
+directory, so they survive the process.
+"""
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+from array import array
+from collections import OrderedDict, namedtuple
+from types import MappingProxyType
+from typing import Optional
+
+from .columns import Columns, _values, is_ndarray_type, key_paths
+from .plistlib import loads
+
+CacheInfo = namedtuple("CacheInfo", "hits misses evictions entries bytes")
+DiskCacheInfo = namedtuple("DiskCacheInfo", "hits rehashed misses")
+
+# Bump when the parser starts producing different values, to ignore old
+# entries on disk.
+_DISK_FORMAT = 1
+_PICKLE_PROTOCOL = 5
+_MISSING = object()
+
+_MODES = ("shared", "copy", "frozen")
+# Options that do not change the parsed value, and are left out of keys.
+_UNKEYED = ("intern_table", "stats")
+
+
+def _leaf(value, freeze: bool):
+    """
+    A copy of a mutable value that holds no containers: an `array.array` or
+    NumPy array (a tuple with `freeze`), a bytearray (bytes with `freeze`),
+    or `Columns` (a tuple of read-only rows with `freeze`). Others as they are.
+    """
+    if isinstance(value, Columns):
+        if freeze:
+            return tuple(MappingProxyType(row) for row in _leaf(value, False).iter_rows())
+        copied = Columns(rows=value.rows)
+        for k, column in value.items():
+            if isinstance(column, list):
+                copied[k] = [_leaf(v, False) for v in column]
+            else:
+                copied[k] = _leaf(column, False)
+        return copied
+    if isinstance(value, array):
+        return tuple(value) if freeze else array(value.typecode, value)
+    if isinstance(value, bytearray):
+        return bytes(value) if freeze else bytearray(value)
+    if is_ndarray_type(type(value)):
+        return tuple(_values(value)) if freeze else value.copy()
+    return value
+
+
+def _rebuild(value, freeze: bool):
+    """
+    Copy the dictionaries, lists and tuples in `value`, and the values
+    `_leaf` copies. With `freeze`, dictionaries become read-only mappings
+    and lists become tuples. Uses an explicit stack, so any depth can be
+    copied.
+    """
+    if not isinstance(value, (dict, list, tuple)) or isinstance(value, Columns):
+        return _leaf(value, freeze)
+
+    def open_(src, key):
+        if isinstance(src, dict):
+            return src, type(src)(), iter(src.items()), key
+        return src, [], enumerate(src), key
+
+    def close(src, out):
+        if isinstance(out, dict):
+            return MappingProxyType(out) if freeze else out
+        return tuple(out) if freeze or isinstance(src, tuple) else out
+
+    stack = [open_(value, None)]
+    while True:
+        src, out, items, key = stack[-1]
+        for k, v in items:
+            if isinstance(v, (dict, list, tuple)) and not isinstance(v, Columns):
+                stack.append(open_(v, k))
+                break
+            v = _leaf(v, freeze)
+            if isinstance(out, dict):
+                out[k] = v
+            else:
+                out.append(v)
+        else:
+            stack.pop()
+            done = close(src, out)
+            if not stack:
+                return done
+            parent = stack[-1][1]
+            if isinstance(parent, dict):
+                parent[key] = done
+            else:
+                parent.append(done)
+
+
+class CachedLoader:
+    """
+    Load plist files by path, keeping the results of recent loads.
+
+    An entry is used while the file keeps its `st_mtime_ns` and `st_size`,
+    and only for loads with the same options. The least recently used
+    entries are dropped when there are more than `max_entries`, or when the
+    files behind them add up to more than `max_bytes` (None for no limit),
+    the file size standing in for the size of the parsed value. An
+    `intern_table` or `stats` passed along does not count as a different
+    option, and is not used for loads served from the cache.
+
+    :param disk: A `DiskCache` to try before parsing.
+    :param mode: What callers get. "shared" hands out the cached value
+    itself, so it must not be modified. "copy" hands out a fresh deep copy on
+    every load. "frozen" hands out a read-only version, with dictionaries as
+    `types.MappingProxyType`, arrays (also `array.array` and NumPy ones) as
+    tuples, bytearrays as bytes, and `Columns` as tuples of rows.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 128,
+        max_bytes=None,
+        *,
+        disk: "Optional[DiskCache]" = None,
+        mode: str = "shared",
+    ):
+        if mode not in _MODES:
+            raise ValueError("unknown mode {m!r}".format(m=mode))
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.disk = disk
+        self.mode = mode
+        self._entries: OrderedDict = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def load(self, path, **kwargs):
+        """
+        Like `plistlib.load_path(path, **kwargs)`, but served from the cache
+        when the file has not changed.
+        """
+        path = os.fspath(path)
+        key = (path, _options(kwargs))
+        st = os.stat(path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[:2] == (st.st_mtime_ns, st.st_size):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._hand_out(entry[2])
+            self.misses += 1
+        if self.disk is not None:
+            value = self.disk.load(path, **kwargs)
+        else:
+            with open(path, "rb") as fp:
+                st = os.fstat(fp.fileno())
+                value = loads(fp.read(), **kwargs)
+        if self.mode == "frozen":
+            value = _rebuild(value, freeze=True)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (st.st_mtime_ns, st.st_size, value)
+            self._bytes += st.st_size
+            self._evict()
+        return self._hand_out(value)
+
+    def _hand_out(self, value):
+        return _rebuild(value, freeze=False) if self.mode == "copy" else value
+
+    def _evict(self):
+        entries = self._entries
+        while entries and (
+            len(entries) > self.max_entries
+            or (self.max_bytes is not None and self._bytes > self.max_bytes)
+        ):
+            _, (_, size, _) = entries.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
+
+    def invalidate(self, path) -> None:
+        """Forget every entry for `path`."""
+        path = os.fspath(path)
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == path]:
+                self._bytes -= self._entries.pop(key)[1]
+
+    def clear(self) -> None:
+        """Forget every entry. The statistics are kept."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def info(self) -> CacheInfo:
+        """Hit, miss and eviction counts, and the current size of the cache."""
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.evictions, len(self._entries), self._bytes)
+
+
+def _options(kwargs) -> tuple:
+    """
+    The load options as sorted, hashable `(name, value)` pairs, with the
+    `columns` paths in order and without the options in `_UNKEYED`.
+    """
+    options = []
+    for k, v in sorted(kwargs.items()):
+        if k in _UNKEYED:
+            continue
+        if k == "columns" and v is not None:
+            v = tuple(sorted(key_paths(v)))
+        options.append((k, v))
+    return tuple(options)
+
+
+def _options_digest(kwargs) -> str:
+    parts = [str(_DISK_FORMAT), str(_PICKLE_PROTOCOL)]
+    for k, v in _options(kwargs):
+        if isinstance(v, type):
+            v = v.__module__ + "." + v.__qualname__
+        parts.append("{k}={v!r}".format(k=k, v=v))
+    return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
+class DiskCache:
+    """
+    Parsed plists stored in `directory`, so later processes can skip parsing.
+
+    Values are pickled under the SHA-256 of the file's contents and a digest of
+    the load options, so identical files share an entry. A small stamp per
+    source path records its size, `st_mtime_ns` and hash: when size and time
+    still match, the stored value is used right away; otherwise the file is
+    hashed, and only parsed when no value is stored for the new contents.
+
+    Pickles can run code when loaded, so the directory must be as trusted as
+    the code using it. Unreadable entries are ignored and written again.
+    """
+
+    def __init__(self, directory):
+        self.directory = os.fspath(directory)
+        os.makedirs(self.directory, exist_ok=True)
+        self.hits = 0
+        self.rehashed = 0
+        self.misses = 0
+
+    def load(self, path, **kwargs):
+        """Like `plistlib.load_path(path, **kwargs)`, from the cache if possible."""
+        if kwargs.get("lazy"):
+            raise ValueError("lazy values cannot be cached on disk")
+        path = os.path.abspath(os.fspath(path))
+        options = _options_digest(kwargs)
+        name = hashlib.sha256(os.fsencode(path)).hexdigest()[:32]
+        stamp_path = os.path.join(self.directory, name + "-" + options + ".stamp")
+        st = os.stat(path)
+        stamp = self._read_stamp(stamp_path)
+        if stamp is not None and stamp[:2] == (st.st_size, st.st_mtime_ns):
+            value = self._read_value(stamp[2], options)
+            if value is not _MISSING:
+                self.hits += 1
+                return value
+        with open(path, "rb") as fp:
+            st = os.fstat(fp.fileno())
+            data = fp.read()
+        digest = hashlib.sha256(data).hexdigest()
+        value = self._read_value(digest, options)
+        if value is _MISSING:
+            self.misses += 1
+            value = loads(data, **kwargs)
+            try:
+                blob = pickle.dumps(value, protocol=_PICKLE_PROTOCOL)
+            except RecursionError:
+                return value  # too deep for pickle; parsed every time
+            except (TypeError, pickle.PicklingError):
+                return value  # such as memoryviews, with data_type=memoryview
+            self._write(self._value_path(digest, options), blob)
+        else:
+            self.rehashed += 1
+        stamp = "{s} {m} {d}".format(s=st.st_size, m=st.st_mtime_ns, d=digest)
+        self._write(stamp_path, stamp.encode("ascii"))
+        return value
+
+    def info(self) -> DiskCacheInfo:
+        """Loads served by the stamp, by hashing the file, and by parsing."""
+        return DiskCacheInfo(self.hits, self.rehashed, self.misses)
+
+    def _value_path(self, digest, options):
+        return os.path.join(self.directory, digest + "-" + options + ".pickle")
+
+    @staticmethod
+    def _read_stamp(stamp_path):
+        try:
+            with open(stamp_path, "rb") as f:
+                size, mtime, digest = f.read().decode("ascii").split()
+            return int(size), int(mtime), digest
+        except (OSError, ValueError):
+            return None
+
+    def _read_value(self, digest, options):
+        try:
+            with open(self._value_path(digest, options), "rb") as f:
+                return pickle.load(f)
+        except Exception:
+            # Missing, damaged, or made for other code; it gets replaced.
+            return _MISSING
+
+    def _write(self, path, data: bytes):
+        # Write a temporary file and rename it, so readers never see half of it.
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+
+_default = CachedLoader()
+
+
+def load_cached(path, **kwargs):
+    """`CachedLoader.load` on a shared, process-wide loader."""
+    return _default.load(path, **kwargs)
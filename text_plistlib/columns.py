@@ -0,0 +1,172 @@
+"""
+Arrays of dictionaries kept as columns, and arrays of numbers.
+
+A table such as `({ id = <*I1>; name = a; }, { id = <*I2>; name = b; })` is
+read as `Columns({"id": array("q", [1, 2]), "name": ["a", "b"]}, rows=2)`:
+one array per key instead of one dictionary per row. Integers go into
+`array("q")` and floats into `array("d")`, or into NumPy arrays with
+`array_type="numpy"`; other values are kept in lists.
+
+With `numeric_arrays`, an array of nothing but `<*I...>` or nothing but
+`<*R...>` becomes an `array("q")` or `array("d")` in the same way.
+"""
+import sys
+from array import array
+from typing import Iterable, Iterator, Optional, Tuple
+
+ARRAY_TYPES = ("array", "numpy")
+_CONTAINERS = (dict, list, tuple, array)
+
+
+class Columns(dict):
+    """
+    A table read column by column: a dictionary from keys to columns, each
+    `rows` long. The writer writes it back as an array of dictionaries.
+    """
+
+    def __init__(self, columns=(), *, rows: int = 0):
+        super().__init__(columns)
+        self._rows = rows
+
+    @property
+    def rows(self) -> int:
+        """The number of rows; only kept apart for a table without keys."""
+        return len(next(iter(self.values()))) if self else self._rows
+
+    def __repr__(self):
+        return "{t}({d}, rows={r})".format(t=type(self).__name__, d=dict.__repr__(self), r=self.rows)
+
+    def iter_rows(self, dict_type=dict) -> Iterator[dict]:
+        """Each row as a dictionary."""
+        keys = list(self)
+        for row in zip(*(_values(c) for c in self.values())) if keys else [()] * self.rows:
+            yield dict_type(zip(keys, row))
+
+
+def key_paths(paths: Iterable) -> frozenset:
+    """
+    The key paths to read as columns, as tuples of dictionary keys leading
+    from the top of the document to an array; a str stands for a one-key
+    path, and () for a top-level array.
+    """
+    return frozenset((p,) if isinstance(p, str) else tuple(p) for p in paths)
+
+
+def make_columns(keys, columns, rows: int, array_type: str = "array") -> Columns:
+    """`Columns` from lists of values, one per key, with numbers packed into arrays."""
+    return Columns(zip(keys, (_pack(c, array_type) for c in columns)), rows=rows)
+
+
+def as_array_type(packed: array, array_type: str):
+    """`packed`, or a NumPy array of it for `array_type="numpy"`."""
+    if array_type == "numpy":
+        import numpy
+
+        return numpy.asarray(packed)
+    return packed
+
+
+def _pack(values, array_type: str):
+    """`values` packed into an array if they are all ints or all floats."""
+    kinds = set(map(type, values))
+    if kinds == {int}:
+        try:
+            packed = array("q", values)
+        except OverflowError:
+            return values
+    elif kinds == {float}:
+        packed = array("d", values)
+    else:
+        return values
+    return as_array_type(packed, array_type)
+
+
+def pack_numbers(value, array_type: str = "array"):
+    """
+    `value` with its non-empty arrays of nothing but ints, or nothing but
+    floats, packed, for parsers that do not read them in one go.
+    """
+    if isinstance(value, dict):
+        for k, v in value.items():
+            if isinstance(v, (dict, list, tuple)):
+                value[k] = pack_numbers(v, array_type)
+        return value
+    if not isinstance(value, (list, tuple)) or not value:
+        return value
+    packed = _pack(value, array_type)
+    if packed is not value:
+        return packed
+    items = [pack_numbers(v, array_type) if isinstance(v, (dict, list, tuple)) else v for v in value]
+    return items if isinstance(value, list) else tuple(items)
+
+
+def _values(column):
+    """A column as a sequence of plain Python values, which NumPy arrays are not."""
+    if isinstance(column, (list, tuple, array)):
+        return column
+    tolist = getattr(column, "tolist", None)
+    return tolist() if tolist is not None else column
+
+
+def is_ndarray_type(t: type) -> bool:
+    """Whether `t` is a NumPy array type, without importing NumPy."""
+    numpy = sys.modules.get("numpy")
+    return numpy is not None and issubclass(t, numpy.ndarray)
+
+
+def _number_type(values) -> Optional[type]:
+    """int or float for an `array.array` or NumPy array of those, else None."""
+    if isinstance(values, array):
+        code, ints, floats = values.typecode, "bBhHiIlLqQ", "fd"
+    else:
+        code, ints, floats = values.dtype.kind, "iu", "f"
+    if code in ints:
+        return int
+    if code in floats:
+        return float
+    return None
+
+
+def split_rows(value) -> Optional[Tuple[list, list]]:
+    """
+    (keys, lists of values) for a list of dictionaries with the same keys in
+    the same order, holding no containers; None for anything else.
+    """
+    if not isinstance(value, (list, tuple)) or not value:
+        return None
+    keys: list = []
+    columns: list = []
+    for i, row in enumerate(value):
+        if not isinstance(row, dict):
+            return None
+        if i == 0:
+            keys = list(row)
+            columns = [[] for _ in keys]
+        elif len(row) != len(keys) or any(a != b for a, b in zip(row, keys)):
+            return None
+        for column, v in zip(columns, row.values()):
+            if isinstance(v, _CONTAINERS):
+                return None
+            column.append(v)
+    return keys, columns
+
+
+def columnize(value, paths: frozenset, array_type: str = "array"):
+    """
+    `value` with the arrays of dictionaries at `paths` turned into `Columns`,
+    for parsers that do not build them as they go.
+    """
+    if () in paths:
+        table = split_rows(value)
+        if table is not None:
+            return make_columns(*table, rows=len(value), array_type=array_type)
+    for path in paths:
+        parent = value
+        for key in path[:-1]:
+            parent = parent.get(key) if isinstance(parent, dict) else None
+        if isinstance(parent, dict) and path and path[-1] in parent:
+            rows = parent[path[-1]]
+            table = split_rows(rows)
+            if table is not None:
+                parent[path[-1]] = make_columns(*table, rows=len(rows), array_type=array_type)
+    return value
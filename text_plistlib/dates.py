@@ -0,0 +1,74 @@
+"""
+Reading and writing `<*D...>` dates, which are "YYYY-MM-DD HH:MM:SS +HHMM".
+
+Dates spelled exactly like that are taken apart by position, with one
+`timezone` kept for each offset, instead of going through `strptime`; other
+spellings still go through it. Dates are written by formatting their fields
+directly, and with `strftime` where it would write something else.
+"""
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+FORMAT = "%Y-%m-%d %H:%M:%S %z"
+
+_OFFSET = re.compile(r"([-+])([0-9]{2})([0-5][0-9])\Z")
+# Time zones by how the offset is spelled, and offsets as `strftime` spells
+# them. Only valid offsets are kept, and no more than this many.
+_OFFSETS_KEPT = 4096
+_TIMEZONES: Dict[str, timezone] = {}
+_SPELLINGS: Dict[timedelta, str] = {}
+_fromisoformat = datetime.fromisoformat
+
+
+def _timezone(spelling: str) -> Optional[timezone]:
+    m = _OFFSET.match(spelling)
+    if m is None:
+        return None
+    sign, hours, minutes = m.groups()
+    offset = timedelta(hours=int(hours), minutes=int(minutes))
+    try:
+        tz = timezone(-offset if sign == "-" else offset)
+    except ValueError:
+        return None  # a day or more; strptime will say so
+    if len(_TIMEZONES) < _OFFSETS_KEPT:
+        _TIMEZONES[spelling] = tz
+    return tz
+
+
+def parse_date(s: str) -> datetime:
+    """The date `s`, as `datetime.strptime(s, FORMAT)` reads it."""
+    if len(s) == 25 and s[4] == s[7] == "-" and s[10] == s[19] == " " and s[13] == s[16] == ":":
+        tz = _TIMEZONES.get(s[20:]) or _timezone(s[20:])
+        if tz is not None:
+            try:
+                return _fromisoformat(s[:19]).replace(tzinfo=tz)
+            except ValueError:
+                pass
+    return datetime.strptime(s, FORMAT)
+
+
+def format_date(val: datetime, utc: bool = True) -> str:
+    """
+    `val` as `val.strftime(FORMAT)` writes it, after converting it to UTC
+    with `utc`.
+    """
+    if utc:
+        val = val.astimezone(timezone.utc)
+    offset = val.utcoffset()
+    if offset is None or val.year < 1000:
+        return val.strftime(FORMAT)  # no offset, or a year without padding
+    spelling = _SPELLINGS.get(offset)
+    if spelling is None:
+        spelling = val.strftime("%z")
+        if len(_SPELLINGS) < _OFFSETS_KEPT:
+            _SPELLINGS[offset] = spelling
+    return "%04d-%02d-%02d %02d:%02d:%02d %s" % (
+        val.year,
+        val.month,
+        val.day,
+        val.hour,
+        val.minute,
+        val.second,
+        spelling,
+    )
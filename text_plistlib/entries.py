@@ -0,0 +1,40 @@
+"""
+Dictionaries given as `(key, value)` pairs, for writing them as they come.
+
+`Entries(pairs)` is written as a dictionary with one entry per pair, taking
+the pairs from `pairs` only as they are written, so a generator over database
+rows never has to become a dict. With `sort_keys`, the writer still has to
+collect and sort the pairs, unless they are declared `ordered`.
+"""
+from typing import Any, Iterable, Iterator, Tuple
+
+
+class Entries:
+    """
+    A dictionary to write, as an iterable of `(key, value)` pairs. With
+    `ordered`, the keys already come in sorted order: the writer checks that
+    instead of sorting them.
+    """
+
+    def __init__(self, pairs: Iterable[Tuple[str, Any]], *, ordered: bool = False):
+        self.pairs = pairs
+        self.ordered = ordered
+
+    def __iter__(self) -> Iterator[Tuple[str, Any]]:
+        return iter(self.pairs)
+
+    def __repr__(self):
+        return "{t}({p!r}, ordered={o})".format(t=type(self).__name__, p=self.pairs, o=self.ordered)
+
+
+def in_order(pairs: Iterable[Tuple[str, Any]]) -> Iterator[Tuple[str, Any]]:
+    """`pairs`, raising ValueError on reaching a key smaller than the one before."""
+    pairs = iter(pairs)
+    for k, v in pairs:
+        yield k, v
+        last = k
+        for k, v in pairs:
+            if k < last:
+                raise ValueError("keys are not in order: {k!r} after {l!r}".format(k=k, l=last))
+            yield k, v
+            last = k
@@ -4,46 +4,404 @@
 The parser and writer classes for text plists. Implements a format for plistlib.
 """
 import binascii
+import codecs
 import plistlib
-from collections import OrderedDict
-from datetime import datetime, timezone
+import re
+from array import array
+from collections import OrderedDict, abc
+from contextlib import nullcontext
+from datetime import datetime
 from enum import IntEnum
-from typing import IO, Union, Dict, Callable
-
-from .pparser import PlistParser
-from .semantics import PlistSemantics
+from functools import lru_cache
+from operator import itemgetter
+from typing import IO, TYPE_CHECKING, Union, Dict, Callable, Iterable, Iterator, Tuple, Any, Optional, Mapping
+
+from .columns import (
+    ARRAY_TYPES,
+    Columns,
+    _number_type,
+    _values,
+    columnize,
+    is_ndarray_type,
+    key_paths,
+    pack_numbers,
+)
+from .dates import format_date
+from .entries import Entries, in_order
+from .semantics import PlistSemantics, one_char_esc
+
+if TYPE_CHECKING:
+    from .scanner import PlistScanner
+    from .stats import ParseStats, WriteStats
 
 Data = plistlib.__dict__.get("Data", None)
 UID = plistlib.UID
 TextPlistDialects = IntEnum("TextPlistDialects", "OpenStep GNUstep PyText")
 TextPlistTypes = Union[str, bytes, int, float, datetime, dict, list, tuple, UID, bool]
 
+# Strings that can be written without quotes (the grammar's `safechar`).
+_BARE = re.compile(r"(?!//|/\*)[-#!$%&*+./0-9:?@A-Z^_a-z|~]+\Z")
+_NEEDS_ESCAPE = re.compile(r'[\x00-\x1f"\\\x7f]')
+_NON_ASCII = re.compile(r"[^\x00-\x7f]+")
+_ESCAPES = {i: "\\{o:03o}".format(o=i) for i in list(range(0x20)) + [0x7F]}
+_ESCAPES.update({ord(v): "\\" + k for k, v in one_char_esc.items()})
+_ESCAPES.update({ord('"'): '\\"', ord("\\"): "\\\\"})
+_EXPONENT = re.compile(r"e\+?(-?)0*(?=[0-9])")
+# How many elements of an array of numbers to format at once.
+_ARRAY_CHUNK = 4096
+# How many entries of an entry list to look at before reading it as a
+# .strings file with `StringsParser`, which decodes and splits all of it.
+_STRINGS_PROBE = 8
+# Stands in for a stats phase when there are no stats.
+_NO_PHASE = nullcontext()
+
+
+def _escape_non_ascii(m) -> str:
+    units = m.group().encode("utf-16-be", "surrogatepass")
+    return "".join(
+        "\\U{u:04x}".format(u=int.from_bytes(units[i : i + 2], "big"))
+        for i in range(0, len(units), 2)
+    )
+
+
+def _quote(s: str, escape_unicode: bool = False) -> bytes:
+    """Quote a string, using the escapes the parser understands."""
+    if _NEEDS_ESCAPE.search(s) is not None:
+        s = s.translate(_ESCAPES)
+    if escape_unicode and not s.isascii():
+        s = _NON_ASCII.sub(_escape_non_ascii, s)
+    return b'"' + s.encode("utf-8", "surrogatepass") + b'"'
+
+
+def _tatsu_parser():
+    """The generated parser. Importing it imports tatsu, which is slow, so wait until it is used."""
+    from .pparser import PlistParser
+
+    return PlistParser()
+
+
+@lru_cache(maxsize=None)
+def _scanner_types():
+    """`(PlistScanner, PlistBytesScanner)`. Importing them compiles the token patterns, so wait until they are used."""
+    from .scanner import PlistScanner, PlistBytesScanner
+
+    return PlistScanner, PlistBytesScanner
+
+
+def _entry_list(scanner: "PlistScanner", text, start: int) -> bool:
+    """Whether a document starts like a .strings file: a string, then `=` or `;`."""
+    m = scanner._token.match(text, start)
+    if m is None or m.lastgroup not in ("safe", "quoted"):
+        return False
+    m = scanner._token.match(text, m.end())
+    return m is not None and m.lastgroup in ("eq", "semi")
+
+
+def _string_entries(scanner: "PlistScanner", text, start: int, count: int = _STRINGS_PROBE) -> bool:
+    """
+    Whether the first `count` entries of an entry list, or all of them if
+    there are fewer, have strings for keys and values.
+    """
+    token = scanner._token.match
+    m = token(text, start)
+    for _ in range(count):
+        if m is None or m.lastgroup not in ("safe", "quoted"):
+            return m is not None and m.lastgroup == "eof"
+        m = token(text, m.end())
+        if m is not None and m.lastgroup == "eq":
+            m = token(text, m.end())
+            if m is None or m.lastgroup not in ("safe", "quoted"):
+                return False
+            m = token(text, m.end())
+        if m is None or m.lastgroup != "semi":
+            return False
+        m = token(text, m.end())
+    return True
+
+
+def _short_float(v: float) -> str:
+    """The shortest spelling of `v` that still reads back as `v`."""
+    s = repr(v)
+    if s.endswith(".0"):
+        s = s[:-2]
+    elif s.startswith("0."):
+        s = s[1:]
+    elif s.startswith("-0."):
+        s = "-" + s[2:]
+    return _EXPONENT.sub(r"e\1", s)
+
 
 class TextPlistParser:
+    engines = ("tatsu", "fast")
+
     def __init__(
         self,
         *,
         dict_type=dict,
         cfuid: bool = True,
         encoding: str = "utf-8-sig",
+        engine: str = "tatsu",
+        lazy: bool = False,
+        max_depth: Optional[int] = None,
+        data_type: type = bytes,
+        intern_keys: bool = False,
+        intern_values: Union[bool, int] = False,
+        intern_table: Optional[dict] = None,
+        columns: Optional[Iterable] = None,
+        numeric_arrays: bool = False,
+        array_type: str = "array",
+        stats: Optional["ParseStats"] = None,
     ):
+        """
+        Text Plist Parser.
+
+        :param engine: "tatsu" for the generated packrat parser, or "fast" for
+        the hand-written scanner in `scanner.py`. Both accept the same grammar.
+        :param lazy: Whether to return read-only proxies for dictionaries and
+        arrays that are only parsed when accessed; see `lazy.py`. This always
+        uses the hand-written scanner.
+        :param max_depth: How deeply dictionaries and arrays may be nested, or
+        None for no limit. The hand-written scanner reads any depth without
+        recursing; this guards against hostile input. The tatsu engine
+        recurses and ignores it.
+        :param data_type: What <hexdata> and <[base64]> values become: bytes,
+        bytearray, or memoryview for slicing large blobs without copying.
+        :param intern_keys: Whether to keep one copy of each distinct key, for
+        documents that repeat the same keys in many dictionaries.
+        :param intern_values: Whether to do the same for string values: True
+        for all of them, or the length up to which they are shared.
+        :param intern_table: Dictionary to share the strings through, which
+        lives on between parses, for example to share keys between many
+        documents. Otherwise each parse has its own.
+        :param columns: Key paths of arrays of dictionaries to read as
+        `Columns`, one array per key instead of one dictionary per row. A path
+        is a tuple of the keys leading to the array from the top-level
+        dictionary, or a str for a single key, or () for a top-level array.
+        Arrays there that are empty, or whose dictionaries differ in keys or
+        key order or hold containers, are read as usual. Lazy parsing and
+        `iterparse` ignore this.
+        :param numeric_arrays: Whether arrays of nothing but `<*I...>`, or
+        nothing but `<*R...>`, become `array("q")` or `array("d")`. The
+        hand-written scanner reads each such array in one go; integers that
+        do not fit in 64 bits keep the array a list. Lazy parsing and
+        `iterparse` ignore this.
+        :param array_type: What those arrays, and columns of integers or
+        floats, become: "array" for `array.array`, or "numpy" for NumPy
+        arrays.
+        :param stats: `ParseStats` to add the timings and counts of each
+        parse to; see `stats.py`. `iterparse` ignores this.
+        """
+        if engine not in self.engines:
+            raise ValueError("unknown engine {e!r}".format(e=engine))
+        if array_type not in ARRAY_TYPES:
+            raise ValueError("unknown array type {a!r}".format(a=array_type))
         self.dict_type = dict_type
         self.cfuid = cfuid
         self.encoding = encoding
+        self.engine = engine
+        self.lazy = lazy
+        self.max_depth = max_depth
+        self.data_type = data_type
+        self.intern_keys = intern_keys
+        self.intern_values = intern_values
+        self.intern_table = intern_table
+        self.columns = key_paths(columns) if columns is not None else None
+        self.numeric_arrays = numeric_arrays
+        self.array_type = array_type
+        self.stats = stats
 
     def parse(self, fp: IO) -> TextPlistTypes:
-        parser = PlistParser()
-        data = fp.read()
-        if isinstance(data, bytes):
-            data = data.decode(self.encoding)
-        model = parser.parse(
-            data,
-            semantics=PlistSemantics(dict_type=self.dict_type, cfuid=self.cfuid),
+        with self._phase("read"):
+            data = fp.read()
+        return self.parse_buffer(data)
+
+    def parse_buffer(self, data) -> TextPlistTypes:
+        """
+        Parse a document held in a str or a bytes-like object, such as bytes,
+        a memoryview or an mmap. With the fast engine and a UTF-8 or ASCII
+        encoding, bytes are scanned in place without decoding them first.
+
+        A document that starts like a .strings file is read as in
+        `parse_strings`. With the tatsu engine, that is only used when every
+        entry is strings.
+        """
+        if self.stats is None:
+            return self._parse_buffer(data)
+        self.stats.bytes_in += data.nbytes if isinstance(data, memoryview) else len(data)
+        value = self._parse_buffer(data)
+        self.stats.done(value, count=not self.lazy)
+        return value
+
+    def _parse_buffer(self, data) -> TextPlistTypes:
+        if self.lazy:
+            from .lazy import parse_lazy
+
+            with self._phase("parse"):
+                return parse_lazy(*self._scanner(data))
+        interning = self._interning()
+        scanner, text, start = self._scanner(data, interning)
+        if _entry_list(scanner, text, start):
+            if self.engine == "fast":
+                if _string_entries(scanner, text, start):
+                    return self._parse_strings(data)
+                with self._phase("parse"):
+                    return scanner.parse(text, start)
+            from .strings import StringsParser
+
+            data = self._decode(data)
+            with self._phase("parse"):
+                retval, end = StringsParser(dict_type=self.dict_type, **interning).parse(data)
+            if end == len(data):
+                return self._collapse(retval)
+        if self.engine == "fast":
+            with self._phase("parse"):
+                return scanner.parse(text, start)
+        data = self._decode(data)
+        parser = _tatsu_parser()
+        semantics = PlistSemantics(
+            dict_type=self.dict_type,
+            cfuid=self.cfuid,
+            data_type=self.data_type,
+            **interning,
         )
+        if self.stats is not None:
+            semantics = self.stats.watch_tatsu(parser, semantics)
+        with self._phase("parse"):
+            model = parser.parse(data, semantics=semantics)
+        if self.numeric_arrays or self.columns:
+            with self._phase("post"):
+                if self.numeric_arrays:
+                    model = pack_numbers(model, self.array_type)
+                if self.columns:
+                    model = columnize(model, self.columns, self.array_type)
         return model
 
+    def parse_strings(self, data) -> TextPlistTypes:
+        """
+        Parse a .strings file held in a str or a bytes-like object. The
+        document is always read as `key = value;` entries, like the `start`
+        rule does when the first string is followed by `=` or `;`.
+
+        The text is decoded once, and entries whose keys and values are
+        strings are read by `StringsParser`. From the first other entry on,
+        the hand-written scanner takes over, whatever the engine.
+        """
+        if self.stats is None:
+            return self._parse_strings(data)
+        self.stats.bytes_in += data.nbytes if isinstance(data, memoryview) else len(data)
+        value = self._parse_strings(data)
+        self.stats.done(value)
+        return value
+
+    def _parse_strings(self, data) -> TextPlistTypes:
+        from .strings import StringsParser
+
+        text = self._decode(data)
+        if self.max_depth is not None and self.max_depth < 1:
+            # The file's dictionary is a level, as for the scanner.
+            message = "nested deeper than {n} levels".format(n=self.max_depth)
+            raise self._str_scanner()._fail(text, 0, message)
+        interning = self._interning()
+        with self._phase("parse"):
+            retval, end = StringsParser(dict_type=self.dict_type, **interning).parse(text)
+            if end < len(text):
+                rest = self._str_scanner(interning)._nest(text, end, "eof", collapse=False)[0]
+                retval.update(rest)
+        return self._collapse(retval)
+
+    def _phase(self, name: str):
+        """A `with` block timing phase `name` in the stats, if kept."""
+        return _NO_PHASE if self.stats is None else self.stats.phase(name)
+
+    def _decode(self, data) -> str:
+        if isinstance(data, str):
+            return data
+        with self._phase("decode"):
+            return str(data, self.encoding)
+
+    def _collapse(self, entries):
+        """The top-level `entries`, or the UID they stand for."""
+        if self.cfuid and len(entries) == 1 and isinstance(entries.get("CF$UID"), int):
+            return UID(entries["CF$UID"])
+        return entries
+
+    def _interning(self) -> dict:
+        """Interning options for one parse, sharing one table."""
+        if not self.intern_keys and not self.intern_values:
+            return {}
+        return dict(
+            intern_keys=self.intern_keys,
+            intern_values=self.intern_values,
+            intern_table={} if self.intern_table is None else self.intern_table,
+        )
+
+    def _scanner(self, data, interning: Optional[dict] = None):
+        """
+        Pick a scanner for `data`. Returns (scanner, text, start). Its
+        strings are interned with the `interning` options, or a table of its
+        own.
+        """
+        if interning is None:
+            interning = self._interning()
+        if not isinstance(data, str):
+            codec = codecs.lookup(self.encoding).name
+            if codec not in ("utf-8", "utf-8-sig", "ascii"):
+                data = self._decode(data)
+            else:
+                scanner = _scanner_types()[1](
+                    dict_type=self.dict_type,
+                    cfuid=self.cfuid,
+                    max_depth=self.max_depth,
+                    data_type=self.data_type,
+                    encoding="ascii" if codec == "ascii" else "utf-8",
+                    columns=self.columns,
+                    numeric_arrays=self.numeric_arrays,
+                    array_type=self.array_type,
+                    **interning,
+                )
+                start = 3 if codec == "utf-8-sig" and data[:3] == codecs.BOM_UTF8 else 0
+                return scanner, data, start
+        return self._str_scanner(interning), data, 0
+
+    def _str_scanner(self, interning: Optional[dict] = None) -> "PlistScanner":
+        if interning is None:
+            interning = self._interning()
+        return _scanner_types()[0](
+            dict_type=self.dict_type,
+            cfuid=self.cfuid,
+            max_depth=self.max_depth,
+            data_type=self.data_type,
+            columns=self.columns,
+            numeric_arrays=self.numeric_arrays,
+            array_type=self.array_type,
+            **interning,
+        )
+
+    def iterparse(self, fp: IO, chunk_size: int = 65536) -> Iterator[Tuple[str, Any]]:
+        """
+        Parse incrementally, reading `chunk_size` bytes at a time. Yields
+        `(event, value)` pairs; see `PlistScanner.iterparse`. This always uses
+        the hand-written scanner.
+        """
+        scanner = self._str_scanner()
+        return scanner.iterparse(self._chunks(fp, chunk_size))
+
+    def _chunks(self, fp: IO, chunk_size: int) -> Iterator[str]:
+        decoder = codecs.getincrementaldecoder(self.encoding)()
+        while True:
+            data = fp.read(chunk_size)
+            if not data:
+                break
+            if isinstance(data, bytes):
+                data = decoder.decode(data)
+            if data:
+                yield data
+        data = decoder.decode(b"", final=True)
+        if data:
+            yield data
+
     def ast(self, fp: IO):
-        parser = PlistParser()
+        parser = _tatsu_parser()
         data = fp.read()
         if isinstance(data, bytes):
             data = data.decode(self.encoding)
@@ -64,6 +422,11 @@ class TextPlistWriter:
         fallback: bool = True,
         strings: bool = False,
         utc: bool = True,
+        buffer_size: int = 65536,
+        bare_strings: bool = False,
+        converters: Optional[Mapping[type, Callable[[Any], Any]]] = None,
+        compact: bool = False,
+        stats: Optional["WriteStats"] = None,
     ):
         """
         Text Plist Writer.
@@ -74,8 +437,26 @@ class TextPlistWriter:
         :param fallback: Whether to write not-really-exact values when the
         format does not support serializing something.
         :param strings: Whether we are writng a strings file.
+        :param buffer_size: How many bytes `write` collects before writing
+        them out to the file. It always flushes when done; the other `write_*`
+        methods write to the file as they go.
+        :param bare_strings: Whether to leave strings unquoted when the
+        grammar allows it.
+        :param converters: Functions turning values of other types into
+        something writable, by type; see `register`.
+        :param compact: Whether to write as few bytes as possible: no
+        whitespace, bare strings where allowed, the shorter of hex and base64
+        for data, and floats without redundant digits.
+        :param stats: `WriteStats` to add the timings and counts of each
+        `write` to; see `stats.py`.
         """
         self.fp = file
+        self.buffer_size = buffer_size
+        self._buf = bytearray()
+        # Bytes to buffer before flushing: buffer_size while `write` runs,
+        # else none, so that the `write_*` methods write to the file.
+        self._flush_at = 1
+        self._indents = [b""]
         self.indent_level = 0
         self.indent = indent
         self.sort_keys = sort_keys
@@ -86,29 +467,67 @@ class TextPlistWriter:
         self.fallback = fallback
         self.strings = strings
         self.utc = utc
+        self.bare_strings = bare_strings or compact
+        self.compact = compact
+        self.converters = dict(converters or ())
+        self._handlers: Dict[type, Callable] = {}
+        self.stats = stats
 
     @staticmethod
     def _width(indentstr):
         return len(indentstr.replace("\t", " " * 8))
 
+    def _write(self, data: bytes):
+        self._buf += data
+        if len(self._buf) >= self._flush_at:
+            self.flush()
+
+    def flush(self):
+        """Write out whatever is buffered."""
+        if self._buf:
+            if self.stats is None:
+                self.fp.write(self._buf)
+            else:
+                self.stats.flush(self.fp, self._buf)
+            self._buf = bytearray()
+
+    def _indentation(self, level: int) -> bytes:
+        indents = self._indents
+        while len(indents) <= level:
+            indents.append(self.indent * len(indents))
+        return indents[level]
+
     def _indent(self):
-        self.fp.write(self.indent * self.indent_level)
+        self._write(self._indentation(self.indent_level))
 
     def write(self, value):
         """Write the value into the file IO."""
-        if self.strings and isinstance(value, dict):
-            self.write_dict(value, strings_top=True)
-        else:
-            self.write_value(value)
+        if self.stats is None:
+            self._write_top(value)
+            return
+        with self.stats.phase("write"):
+            self._write_top(value)
+        self.stats.done()
+
+    def _write_top(self, value):
+        self._flush_at = self.buffer_size
+        try:
+            if self.strings and isinstance(value, (dict, Entries)) and not isinstance(value, Columns):
+                self.write_dict(value, strings_top=True)
+            else:
+                self.write_value(value)
+        finally:
+            self._flush_at = 1
+            self.flush()
 
     def write_none(
         self,
         _,
     ):
         if self.dialect == TextPlistDialects.PyText:
-            self.fp.write(b"<*N>")
+            self._write(b"<*N>")
         elif self.fallback:
-            self.fp.write(b'""')
+            self._write(b'""')
         else:
             raise TypeError(
                 "None is not directly representable in dialect {f!s}.".format(
@@ -117,133 +536,376 @@ class TextPlistWriter:
             )
 
     def write_string(self, s):
-        # I thought I wrote this before but apparently I didn't.
-        # Anyway, let's cheat and use the JSON encoder. What can go wrong?
-        import json
-
-        self.fp.write(json.dumps(s, ensure_ascii=self.escape_unicode).encode("utf-8"))
+        if self.bare_strings and _BARE.match(s):
+            self._write(s.encode("ascii"))
+        else:
+            self._write(_quote(s, self.escape_unicode))
 
     def write_uid(self, val):
         if self.dialect == TextPlistDialects.PyText:
-            self.fp.write(b"<*U%d>" % val.data)
+            self._write(b"<*U%d>" % val.data)
         else:
-            self.write_dict({b"CF$UID": int(val.data)})
+            self.write_dict({"CF$UID": int(val.data)})
 
     def write_int(self, val):
         if self.dialect >= TextPlistDialects.GNUstep:
-            self.fp.write(b"<*I%d>" % val)
+            self._write(b"<*I%d>" % val)
         else:
-            self.fp.write(b"%d" % val)
+            self._write(b"%d" % val)
 
     def write_float(self, val):
+        if self.compact and self.float_fmt == "{v}":
+            formatted = _short_float(val).encode("ascii")
+        else:
+            formatted = self.float_fmt.format(v=val).encode("ascii")
         if self.dialect >= TextPlistDialects.GNUstep:
-            self.fp.write(b"<*R{v}>".format(v=val))
+            self._write(b"<*R" + formatted + b">")
         else:
-            self.fp.write(str(val))
+            self._write(formatted)
 
     def write_data(self, val):
         global Data
-        if isinstance(val, Data):
+        if Data is not None and isinstance(val, Data):
             val: bytes = val.data
+        elif isinstance(val, memoryview):
+            val = val.cast("B")
+        if self.compact:
+            # Base64 takes 4 * ceil(n / 3) + 4 bytes, hex 2 * n + 2.
+            n = len(val)
+            if self.dialect >= TextPlistDialects.GNUstep and (n + 2) // 3 * 4 + 2 < 2 * n:
+                self._write(b"<[" + binascii.b2a_base64(val, newline=False) + b"]>")
+            else:
+                self._write(b"<" + binascii.b2a_hex(val) + b">")
         # break-even at 3 and 4
-        if self.dialect >= TextPlistDialects.GNUstep and len(val) < 5:
-            self.fp.write(b"<[")
-            self.fp.write(binascii.b2a_base64(val))
-            self.fp.write(b"]>")
+        elif self.dialect >= TextPlistDialects.GNUstep and len(val) < 5:
+            self._write(b"<[")
+            self._write(binascii.b2a_base64(val))
+            self._write(b"]>")
         else:
-            self.fp.write(b"<")
-            self.fp.write(val.hex(" ", -4).encode("ascii"))
-            self.fp.write(b">")
+            self._write(b"<")
+            self._write(binascii.b2a_hex(val, b" ", -4))
+            self._write(b">")
 
     def write_datetime(self, val):
-        if self.utc:
-            val = val.astimezone(timezone.utc)
-        formatted = val.strftime("%Y-%m-%d %H:%M:%S %z").encode("ascii")
+        formatted = format_date(val, self.utc).encode("ascii")
         if self.dialect >= TextPlistDialects.GNUstep:
-            self.fp.write(b"<*D")
-            self.fp.write(formatted)
-            self.fp.write(b">")
+            self._write(b"<*D")
+            self._write(formatted)
+            self._write(b">")
         else:
-            self.fp.write(formatted)
+            self._write(b'"' + formatted + b'"')
 
     def write_dict(self, val, strings_top=False):
-        keys = val.keys()
-        if self.sort_keys:
-            keys = sorted(keys)
-        if not strings_top:
-            self.fp.write(b"{\n")
-            self.indent_level += 1
-        for k in keys:
+        if self.compact:
+            self._write_tree(self._iter_dict_compact(val, strings_top))
+        else:
+            self._write_tree(self._iter_dict(val, strings_top))
+
+    def _items(self, val):
+        """The `(key, value)` pairs of a mapping or `Entries` to write, in order."""
+        if isinstance(val, Entries):
+            pairs = val.pairs
+            if self.sort_keys:
+                pairs = in_order(pairs) if val.ordered else sorted(pairs, key=itemgetter(0))
+        else:
+            keys = val.keys()
+            if self.sort_keys:
+                keys = sorted(keys)
+            pairs = ((k, val[k]) for k in keys)
+        for k, v in pairs:
             if not isinstance(k, str):
                 if self.skipkeys:
                     continue
                 raise TypeError("keys must be strings")
-            v = val[k]
+            yield k, v
+
+    def _iter_dict(self, val, strings_top=False, items=None):
+        """
+        Write a dict around the values this yields for `write_value`. The
+        `(key, value)` pairs come from `items` if given, as they are.
+        """
+        if not strings_top:
+            self._write(b"{\n")
+            self.indent_level += 1
+        for k, v in self._items(val) if items is None else items:
             self._indent()
             self.write_string(k)
             if v is None and (self.dialect == TextPlistDialects.PyText or strings_top):
                 pass
             else:
-                self.fp.write(b" = ")
-                self.write_value(v)
-            self.fp.write(b";\n")
+                self._write(b" = ")
+                yield v
+            self._write(b";\n")
         if not strings_top:
             self.indent_level -= 1
             self._indent()
-            self.fp.write(b"}")
+            self._write(b"}")
+
+    def _iter_dict_compact(self, val, strings_top=False, items=None):
+        """Like `_iter_dict`, without whitespace."""
+        if not strings_top:
+            self._write(b"{")
+        for k, v in self._items(val) if items is None else items:
+            self.write_string(k)
+            if v is None and (self.dialect == TextPlistDialects.PyText or strings_top):
+                pass
+            else:
+                self._write(b"=")
+                yield v
+            self._write(b";")
+        if not strings_top:
+            self._write(b"}")
 
     def write_list(self, val):
-        self.fp.write(b"(\n")
+        if self.compact:
+            self._write_tree(self._iter_list_compact(val))
+        else:
+            self._write_tree(self._iter_list(val))
+
+    def _iter_list(self, val):
+        """Write a list around the values this yields for `write_value`."""
+        self._write(b"(\n")
         self.indent_level += 1
         for v in val:
             self._indent()
-            self.write_value(v)
-            self.fp.write(b",\n")
+            yield v
+            self._write(b",\n")
+        self.indent_level -= 1
+        self._indent()
+        self._write(b")")
+
+    def _iter_list_compact(self, val):
+        """Like `_iter_list`, without whitespace or a trailing comma."""
+        self._write(b"(")
+        items = iter(val)
+        for v in items:
+            yield v
+            for v in items:
+                self._write(b",")
+                yield v
+        self._write(b")")
+
+    def write_columns(self, val):
+        if self.compact:
+            self._write_tree(self._iter_columns_compact(val))
+        else:
+            self._write_tree(self._iter_columns(val))
+
+    def _rows(self, val):
+        """
+        The rows of `Columns`, each as `(key, value)` pairs taken from the
+        columns, so no dictionary is built for them.
+        """
+        keys = []
+        columns = []
+        for k, column in self._items(val):
+            keys.append(k)
+            columns.append(_values(column))
+        rows = val.rows
+        if any(len(column) != rows for column in columns):
+            raise ValueError("columns must all be {n} long".format(n=rows))
+        for row in zip(*columns) if columns else [()] * rows:
+            yield zip(keys, row)
+
+    def _iter_columns(self, val):
+        """Write `Columns` as an array of dictionaries, like `_iter_list`."""
+        self._write(b"(\n")
+        self.indent_level += 1
+        for row in self._rows(val):
+            self._indent()
+            yield from self._iter_dict(None, items=row)
+            self._write(b",\n")
         self.indent_level -= 1
         self._indent()
-        self.fp.write(b")")
+        self._write(b")")
+
+    def _iter_columns_compact(self, val):
+        """Like `_iter_columns`, without whitespace or a trailing comma."""
+        self._write(b"(")
+        rows = self._rows(val)
+        for row in rows:
+            yield from self._iter_dict_compact(None, items=row)
+            for row in rows:
+                self._write(b",")
+                yield from self._iter_dict_compact(None, items=row)
+        self._write(b")")
+
+    def write_array(self, val):
+        self._write_tree(self._iter_array(val))
+
+    def _iter_array(self, val):
+        """
+        Write an `array.array` or NumPy array of numbers a chunk of
+        elements at a time, or yield from `_iter_list` for other kinds.
+        """
+        kind = _number_type(val)
+        values = _values(val)
+        if kind is None:
+            yield from self._iter_list_compact(values) if self.compact else self._iter_list(values)
+            return
+        if kind is int:
+            number = str
+        elif self.float_fmt != "{v}":
+            float_fmt = self.float_fmt
+
+            def number(v):
+                return float_fmt.format(v=v)
+
+        elif self.compact:
+            number = _short_float
+        else:
+            number = repr
+        typed = self.dialect >= TextPlistDialects.GNUstep
+        prefix = ("<*I" if kind is int else "<*R") if typed else ""
+        suffix = ">" if typed else ""
+        if self.compact:
+            start, sep, end, empty = b"(", b",", b")", b"()"
+        else:
+            inner = self._indentation(self.indent_level + 1)
+            outer = self._indentation(self.indent_level)
+            start, sep, end = b"(\n" + inner, b",\n" + inner, b",\n" + outer + b")"
+            empty = b"(\n" + outer + b")"
+        if not len(values):
+            self._write(empty)
+            return
+        joiner = suffix + sep.decode("latin-1") + prefix
+        self._write(start)
+        for i in range(0, len(values), _ARRAY_CHUNK):
+            if i:
+                self._write(sep)
+            chunk = values[i : i + _ARRAY_CHUNK]
+            self._write((prefix + joiner.join(map(number, chunk)) + suffix).encode("latin-1"))
+        self._write(end)
 
     def write_bool(self, val):
         if self.dialect >= TextPlistDialects.GNUstep:
-            self.fp.write(b"<*B")
-            self.fp.write(b"Y" if val else b"N")
-            self.fp.write(b">")
+            self._write(b"<*B")
+            self._write(b"Y" if val else b"N")
+            self._write(b">")
         else:
-            self.fp.write(str(val))
+            self._write(str(val).encode("ascii"))
 
     def write_value(self, val) -> None:
-        if val is None:
-            return self.write_none(self)
-
-        method = self.dumpers.get(type(val))
-        if method is None:
-            for t, m in self.dumpers.items():
-                if isinstance(val, t):
-                    method = m
+        self._write_tree(iter((val,)))
+
+    def _write_tree(self, values: Iterator) -> None:
+        """
+        Write each value from `values`. Collections give iterators of their
+        own, which are kept on a stack instead of recursing, along with the
+        ids of the collections being written, to catch one inside itself.
+        """
+        handlers = self._handlers
+        stack = [values]
+        ids = [None]
+        active = set()
+        while stack:
+            for val in stack[-1]:
+                handler = handlers.get(type(val))
+                if handler is None:
+                    handler = self._handler(type(val))
+                children = handler(val)
+                if children is not None:
+                    i = id(val)
+                    if i in active:
+                        raise ValueError("circular reference")
+                    active.add(i)
+                    ids.append(i)
+                    stack.append(children)
                     break
             else:
-                raise TypeError(
-                    "{val!r} is not directly representable in a plist.".format(val=val)
-                )
-        return getattr(self, method)(val)
+                stack.pop()
+                active.discard(ids.pop())
+
+    def register(self, t: type, converter: Callable[[Any], Any]) -> None:
+        """
+        Write values of type `t` (and its subclasses) as `converter(value)`.
+        """
+        self.converters[t] = converter
+        self._handlers.clear()
+
+    def _handler(self, t: type) -> Callable:
+        """
+        Find how to write type `t`, preferring the closest base class, and
+        remember it. Returns a method that either writes the value, or
+        returns an iterator of values to write in its place.
+        """
+        converter = None
+        method = None
+        for base in t.__mro__:
+            if base in self.converters:
+                converter = self.converters[base]
+                break
+            if base in self.dumpers:
+                method = self.dumpers[base]
+                break
+        else:
+            # Converters may be registered for ABCs.
+            for base, c in self.converters.items():
+                if issubclass(t, base):
+                    converter = c
+                    break
+            else:
+                # NumPy arrays, when NumPy is in use, then other mappings, and
+                # anything else iterated in a set order, such as generators.
+                if is_ndarray_type(t):
+                    method = "write_array"
+                elif issubclass(t, abc.Mapping):
+                    method = "write_dict"
+                elif issubclass(t, abc.Iterable) and not issubclass(t, abc.Set):
+                    method = "write_list"
+                else:
+                    raise TypeError(
+                        "{t.__name__} is not directly representable in a plist.".format(t=t)
+                    )
+        if converter is not None:
+
+            def handler(val):
+                return iter((converter(val),))
+
+        else:
+            iterators = self._compact_iterators if self.compact else self._iterators
+            handler = getattr(self, iterators.get(method, method))
+            if self.stats is not None:
+                handler = self.stats.counting(handler, method)
+        self._handlers[t] = handler
+        return handler
 
     global Data
     # Dict[Type[T], Callable[[Any, T], None]] where T <: TextPlistTypes
     dumpers = OrderedDict(
         [
+            (type(None), "write_none"),
             (str, "write_string"),
             (bool, "write_bool"),
             (int, "write_int"),
             (float, "write_float"),
             (bytes, "write_data"),
+            (bytearray, "write_data"),
+            (memoryview, "write_data"),
             (UID, "write_uid"),
             (Data, "write_data"),
             (datetime, "write_datetime"),
+            (Columns, "write_columns"),
             (dict, "write_dict"),
+            (Entries, "write_dict"),
             (list, "write_list"),
             (tuple, "write_list"),
+            (array, "write_array"),
         ]
     )
+    # Collections are written by generators instead, see `_write_tree`.
+    _iterators = {
+        "write_dict": "_iter_dict",
+        "write_list": "_iter_list",
+        "write_columns": "_iter_columns",
+        "write_array": "_iter_array",
+    }
+    _compact_iterators = {
+        "write_dict": "_iter_dict_compact",
+        "write_list": "_iter_list_compact",
+        "write_columns": "_iter_columns_compact",
+        "write_array": "_iter_array",
+    }
 
 
 def is_fmt_text(header: bytes) -> bool:
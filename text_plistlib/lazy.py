@@ -0,0 +1,279 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Lazy loading of text plists.
+
+One structural pass records where every dictionary and array ends. Containers
+are then handed out as read-only proxies that parse their own entries the
+first time they are accessed, leaving nested containers as proxies in turn.
+Syntax errors inside a container are only reported once it is accessed.
+"""
+import re
+from collections.abc import Mapping, Sequence
+from typing import Optional
+from plistlib import InvalidFileException
+
+from .scanner import _COMMENTS
+
+_SAFE = r"[-#!$%&*+./0-9:?@A-Z^_a-z|~]"
+
+# Skip over everything that can hide a bracket, then match one bracket. A
+# slash right after a safe character belongs to an unquoted string, not a
+# comment. Runs are matched atomically through a lookahead, and the star can
+# always go on to the next bracket, so this never backtracks far.
+_STRUCTURE = re.compile(
+    r'(?:(?=(?P<run>[^{}()"/<]+))(?P=run)'
+    r"|(?<!" + _SAFE + r")(?:" + _COMMENTS + r")"
+    r'|"[^"\\]*(?:\\.[^"\\]*)*"'
+    r"|<\[[^\]]*\]>"
+    r"|<[^>/]*(?:(?:" + _COMMENTS + r"|/(?![*/]))[^>/]*)*>"
+    r'|[/"<])*'
+    r"(?:(?P<lbrace>\{)|(?P<lparen>\()|(?P<rbrace>\})|(?P<rparen>\))|\Z)",
+    re.DOTALL,
+)
+_BSTRUCTURE = re.compile(_STRUCTURE.pattern.encode("ascii"), re.DOTALL)
+_OPENING = {"lbrace": "rbrace", "lparen": "rparen"}
+_CLOSING = frozenset(_OPENING.values())
+
+
+def index(text, start: int = 0, max_depth: Optional[int] = None, depth: int = 0) -> dict:
+    """
+    Map the offset of every `{` and `(` to the offset past its closing bracket.
+    Raises InvalidFileException for brackets nested deeper than `max_depth`,
+    counting `depth` levels around the text.
+    """
+    if max_depth is not None and depth > max_depth:
+        raise InvalidFileException(
+            "(offset {o}) nested deeper than {n} levels".format(o=start, n=max_depth)
+        )
+    pattern = _STRUCTURE if isinstance(text, str) else _BSTRUCTURE
+    ends = {}
+    stack = []
+    for m in pattern.finditer(text, start):
+        kind = m.lastgroup
+        if kind in _OPENING:
+            if max_depth is not None and len(stack) + depth >= max_depth:
+                raise InvalidFileException(
+                    "(offset {o}) nested deeper than {n} levels".format(
+                        o=m.start(kind), n=max_depth
+                    )
+                )
+            stack.append((m.start(kind), _OPENING[kind]))
+        elif kind not in _CLOSING:
+            continue  # end of text
+        elif stack and stack[-1][1] == kind:
+            ends[stack.pop()[0]] = m.end()
+        else:
+            raise InvalidFileException(
+                "(offset {o}) unbalanced bracket".format(o=m.start(kind))
+            )
+    if stack:
+        raise InvalidFileException(
+            "(offset {o}) unclosed bracket".format(o=stack[-1][0])
+        )
+    return ends
+
+
+class _Document:
+    """The source text, its index and the scanner used on it."""
+
+    def __init__(self, scanner, text, ends):
+        self.scanner = scanner
+        self.text = text
+        self.ends = ends
+
+    def value(self, m):
+        """Convert the value starting with token `m`. Returns (value, end)."""
+        kind = m.lastgroup
+        conv = self.scanner._scalars.get(kind)
+        if conv is not None:
+            return self.scanner._convert(self.text, m, conv), m.end()
+        elif kind == "lbrace":
+            end = self.ends[m.start(kind)]
+            if self._cfuid(m.end()):
+                return self.scanner._entries(self.text, m.end(), "rbrace")
+            return LazyDict(self, m.end(), "rbrace"), end
+        elif kind == "lparen":
+            return LazyArray(self, m.end()), self.ends[m.start(kind)]
+        raise self.scanner._error(self.text, m, "a value")
+
+    def _cfuid(self, pos) -> bool:
+        """Whether the entries at `pos` start with a CF$UID key."""
+        if not self.scanner.cfuid:
+            return False
+        m = self.scanner._next(self.text, pos)
+        kind = m.lastgroup
+        if kind not in ("safe", "quoted"):
+            return False
+        return self.scanner._scalars[kind](m.group(kind)) == "CF$UID"
+
+    def entries(self, pos, closing):
+        scanner = self.scanner
+        text = self.text
+        next_token = scanner._next
+        keys = scanner._keys
+        retval = scanner.dict_type()
+        while True:
+            m = next_token(text, pos)
+            kind = m.lastgroup
+            if kind == "safe" or kind == "quoted":
+                key = keys[kind](m.group(kind))
+            elif kind == closing:
+                return retval
+            else:
+                raise scanner._error(text, m, "a key")
+            m = next_token(text, m.end())
+            if m.lastgroup == "eq":
+                value, pos = self.value(next_token(text, m.end()))
+                m = next_token(text, pos)
+            else:
+                value = None
+            if m.lastgroup != "semi":
+                raise scanner._error(text, m, "';'")
+            retval[key] = value
+            pos = m.end()
+
+    def items(self, pos):
+        next_token = self.scanner._next
+        text = self.text
+        retval = []
+        m = next_token(text, pos)
+        while m.lastgroup != "rparen":
+            value, pos = self.value(m)
+            retval.append(value)
+            m = next_token(text, pos)
+            if m.lastgroup == "comma":
+                m = next_token(text, m.end())
+            elif m.lastgroup != "rparen":
+                raise self.scanner._error(text, m, "',' or ')'")
+        return retval
+
+
+def materialize(value):
+    """Turn lazy proxies in `value` into ordinary dictionaries and lists."""
+    if not isinstance(value, (LazyDict, LazyArray)):
+        return value
+    # Copy containers with an explicit stack of (proxy items, copy), so deep
+    # documents do not recurse.
+    retval = _empty(value)
+    stack = [(_items(value), retval)]
+    while stack:
+        items, copy = stack[-1]
+        for k, v in items:
+            if isinstance(v, (LazyDict, LazyArray)):
+                child = _empty(v)
+                _store(copy, k, child)
+                stack.append((_items(v), child))
+                break
+            _store(copy, k, v)
+        else:
+            stack.pop()
+    return retval
+
+
+def _empty(proxy):
+    return proxy._doc.scanner.dict_type() if isinstance(proxy, LazyDict) else []
+
+
+def _items(proxy):
+    data = proxy._load()
+    return iter(data.items() if isinstance(proxy, LazyDict) else enumerate(data))
+
+
+def _store(copy, k, v):
+    if isinstance(copy, list):
+        copy.append(v)
+    else:
+        copy[k] = v
+
+
+class LazyDict(Mapping):
+    """A read-only dictionary parsed on first access."""
+
+    __slots__ = ("_doc", "_pos", "_closing", "_data")
+
+    def __init__(self, doc, pos, closing):
+        self._doc = doc
+        self._pos = pos
+        self._closing = closing
+        self._data = None
+
+    def _load(self):
+        if self._data is None:
+            self._data = self._doc.entries(self._pos, self._closing)
+        return self._data
+
+    def __getitem__(self, key):
+        return self._load()[key]
+
+    def __iter__(self):
+        return iter(self._load())
+
+    def __len__(self):
+        return len(self._load())
+
+    def __contains__(self, key):
+        return key in self._load()
+
+    def __repr__(self):
+        return "{t}({d!r})".format(t=type(self).__name__, d=self._load())
+
+    def materialize(self):
+        """Parse everything below this dictionary. Returns a `dict_type`."""
+        return materialize(self)
+
+
+class LazyArray(Sequence):
+    """A read-only list parsed on first access."""
+
+    __slots__ = ("_doc", "_pos", "_data")
+
+    def __init__(self, doc, pos):
+        self._doc = doc
+        self._pos = pos
+        self._data = None
+
+    def _load(self):
+        if self._data is None:
+            self._data = self._doc.items(self._pos)
+        return self._data
+
+    def __getitem__(self, i):
+        return self._load()[i]
+
+    def __len__(self):
+        return len(self._load())
+
+    def __eq__(self, other):
+        if isinstance(other, (list, tuple, LazyArray)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self):
+        return "{t}({d!r})".format(t=type(self).__name__, d=self._load())
+
+    def materialize(self) -> list:
+        """Parse everything below this array."""
+        return materialize(self)
+
+
+def parse_lazy(scanner, text, start: int = 0):
+    """Like `scanner.parse`, but with lazy containers."""
+    m = scanner._next(text, start)
+    kind = m.lastgroup
+    # A .strings style file, its entries one level down like in a dictionary.
+    strings = kind == "eof" or (
+        kind in ("safe", "quoted") and scanner._next(text, m.end()).lastgroup in ("eq", "semi")
+    )
+    doc = _Document(scanner, text, index(text, start, scanner.max_depth, depth=int(strings)))
+    if kind == "eof":
+        return LazyDict(doc, start, "eof")
+    value, pos = doc.value(m)
+    m = scanner._next(text, pos)
+    if m.lastgroup == "eof":
+        return value
+    if strings:
+        if doc._cfuid(start):
+            return scanner._entries(text, start, "eof")[0]
+        return LazyDict(doc, start, "eof")
+    raise scanner._error(text, m, "end of file")
@@ -0,0 +1,204 @@
+"""
+Parsing on a pool of workers: many files at once, or one large dictionary
+split into pieces.
+"""
+import os
+import re
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from plistlib import UID, InvalidFileException
+from typing import Any, Iterable, Iterator, Optional, Tuple, Union
+
+from .impl import TextPlistParser, TextPlistTypes
+from .lazy import _SAFE
+from .plistlib import load_path
+from .scanner import _COMMENTS
+
+_EXECUTORS = {"process": ProcessPoolExecutor, "thread": ThreadPoolExecutor}
+
+
+def _body(n: int) -> str:
+    """One piece of anything but brackets and semicolons; see lazy._STRUCTURE."""
+    run = "run" + str(n)
+    return (
+        r'(?:(?=(?P<' + run + r'>[^{}()"/<;]+))(?P=' + run + r')'
+        r"|(?<!" + _SAFE + r")(?:" + _COMMENTS + r")"
+        r'|"[^"\\]*(?:\\.[^"\\]*)*"'
+        r"|<\[[^\]]*\]>"
+        r"|<[^>/]*(?:(?:" + _COMMENTS + r"|/(?![*/]))[^>/]*)*>"
+        r'|[/"<])'
+    )
+
+
+# Up to a bracket, or through a run of up to 256 entries without brackets, so
+# flat dictionaries take few matches.
+_ENTRY_END = re.compile(
+    _body(1)
+    + r"*(?:(?P<semi>;(?:"
+    + _body(2)
+    + r"*;){0,255})|(?P<open>[{(])|(?P<close>[})])|\Z)",
+    re.DOTALL,
+)
+_BENTRY_END = re.compile(_ENTRY_END.pattern.encode("ascii"), re.DOTALL)
+
+
+def _pool(executor, workers):
+    """Returns (executor, whether we have to shut it down)."""
+    if isinstance(executor, Executor):
+        return executor, False
+    if executor in _EXECUTORS:
+        return _EXECUTORS[executor](max_workers=workers), True
+    raise ValueError("unknown executor {e!r}".format(e=executor))
+
+
+def _load_one(path, kwargs):
+    return load_path(path, **kwargs)
+
+
+def _size(path) -> int:
+    try:
+        return os.stat(path).st_size
+    except OSError:
+        return 0  # reported when the worker gets to it
+
+
+def load_many(
+    paths: Iterable,
+    *,
+    workers: Optional[int] = None,
+    executor: Union[str, Executor] = "process",
+    **kwargs,
+) -> Iterator[Tuple[Any, Any]]:
+    """
+    Load each file in `paths` on a pool of `workers`, yielding
+    `(path, value)` as each one is done. A file that fails to load gives
+    `(path, exception)` instead, and the others carry on.
+
+    The items of `paths` are paths, or `(path, options)` pairs whose options
+    override `kwargs` for that file; all options go to `load_path`. The
+    largest files are started first, so a big one does not hold up the end.
+
+    :param executor: "process" for a process pool, "thread" for a thread
+    pool, or an `Executor` to use as it is; it is not shut down afterwards.
+    With processes, options and results must be picklable.
+    """
+    jobs = []
+    for item in paths:
+        if isinstance(item, tuple):
+            path, options = item
+            options = dict(kwargs, **options)
+        else:
+            path, options = item, kwargs
+        jobs.append((path, options))
+    jobs.sort(key=lambda job: _size(job[0]), reverse=True)
+
+    pool, owned = _pool(executor, workers)
+    try:
+        futures = {pool.submit(_load_one, path, options): path for path, options in jobs}
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result()
+            except Exception as e:
+                yield futures[future], e
+    finally:
+        if owned:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+
+def split_entries(text, start: int, shard_size: int):
+    """
+    Find where the entries of a dictionary starting at `start` (just past
+    its `{`, or at the start of a .strings file) can be cut into pieces of
+    about `shard_size`. Only semicolons outside strings, comments and nested
+    containers count. Returns (cut offsets, end of the entries): the end is
+    the offset of the closing `}`, or the length of a .strings file.
+    """
+    pattern = _ENTRY_END if isinstance(text, str) else _BENTRY_END
+    cuts = []
+    target = start + shard_size
+    depth = 0
+    for m in pattern.finditer(text, start):
+        kind = m.lastgroup
+        if kind == "semi":
+            if depth == 0 and m.end() >= target:
+                cuts.append(m.end())
+                target = m.end() + shard_size
+        elif kind == "open":
+            depth += 1
+        elif kind == "close":
+            if depth == 0:
+                return cuts, m.start(kind)
+            depth -= 1
+        else:
+            break
+    return cuts, len(text)
+
+
+def _parse_entries(parser: TextPlistParser, shard):
+    scanner, text, start = parser._scanner(shard)
+    return scanner._nest(text, start, "eof", collapse=False)[0]
+
+
+def loads_parallel(
+    data,
+    *,
+    workers: Optional[int] = None,
+    executor: Union[str, Executor] = "process",
+    shard_size: int = 1 << 20,
+    **kwargs,
+) -> TextPlistTypes:
+    """
+    Parse a text plist held in a str or bytes-like object, splitting a large
+    top-level dictionary (or .strings file) into pieces of about
+    `shard_size` that are parsed on a pool of `workers`. Other documents, and
+    dictionaries smaller than two pieces, are parsed as usual.
+
+    The result equals that of `TextPlistParser(**kwargs).parse_buffer(data)`:
+    entries keep their order in `dict_type`, and a repeated key keeps its
+    first position and its last value. The pieces are always parsed with the
+    hand-written scanner. On a syntax error, the document is parsed again
+    serially to report it.
+
+    :param executor: As for `load_many`.
+    """
+    parser = TextPlistParser(**kwargs)
+    if parser.lazy or len(data) < 2 * shard_size:
+        return parser.parse_buffer(data)
+    scanner, text, start = parser._scanner(data)
+    m = scanner._next(text, start)
+    if m.lastgroup == "lbrace":
+        begin = m.end()
+    elif m.lastgroup in ("safe", "quoted") and scanner._next(text, m.end()).lastgroup in ("eq", "semi"):
+        begin = start
+    else:
+        return scanner.parse(text, start)
+    cuts, end = split_entries(text, begin, shard_size)
+    if m.lastgroup == "lbrace":
+        after = scanner._token.match(text, end + 1) if end < len(text) else None
+        whole = after is not None and after.lastgroup == "eof"
+    else:
+        whole = end == len(text)
+    if not whole:
+        return scanner.parse(text, start)  # not one dictionary; let it complain
+    bounds = [begin] + [c for c in cuts if c < end] + [end]
+    if len(bounds) < 3:
+        return scanner.parse(text, start)
+
+    pool, owned = _pool(executor, workers)
+    try:
+        futures = []
+        for a, b in zip(bounds, bounds[1:]):
+            shard = text[a:b]
+            if isinstance(shard, memoryview):
+                shard = bytes(shard)
+            futures.append(pool.submit(_parse_entries, parser, shard))
+        retval = parser.dict_type()
+        for future in futures:
+            retval.update(future.result())
+    except InvalidFileException:
+        return scanner.parse(text, start)
+    finally:
+        if owned:
+            pool.shutdown(wait=True, cancel_futures=True)
+    if parser.cfuid and len(retval) == 1 and isinstance(retval.get("CF$UID"), int):
+        return UID(retval["CF$UID"])
+    return retval
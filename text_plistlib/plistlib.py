@@ -10,12 +10,17 @@ __all__ = [  # noqa: F822
     "dump",
     "loads",
     "dumps",
+    "iterparse",
+    "load_path",
+    "load_strings",
+    "loads_strings",
     "UID",
 ]
 
 import plistlib as pl
 from enum import Enum
 from io import BytesIO
+from mmap import mmap as MMap, ACCESS_READ
 from typing import BinaryIO
 
 from .impl import FMT_TEXT_HANDLER, TextPlistTypes
@@ -23,7 +28,7 @@ from .impl import FMT_TEXT_HANDLER, TextPlistTypes
 UID = pl.UID
 InvalidFileException = pl.InvalidFileException
 
-PF = Enum("TextPlistFormat", "FMT_XML FMT_BINARY FMT_TEXT", module=__name__)
+PF = Enum("TextPlistFormat", "FMT_XML FMT_BINARY FMT_TEXT", module=__name__, qualname="PF")
 globals().update(PF.__members__)
 translation = {
     PF.FMT_XML: pl.FMT_XML,
@@ -46,14 +51,65 @@ def load(fp: BinaryIO, *, fmt=None, **kwargs) -> TextPlistTypes:
         return pl.load(fp, fmt=translation[fmt], **kwargs)
 
 
-def loads(value: bytes, **kwargs) -> TextPlistTypes:
+def loads(value: bytes, *, fmt=None, **kwargs) -> TextPlistTypes:
     """
-    Read a .plist file from a bytes object.
+    Read a .plist file from a bytes-like object.
 
     >>> loads(b'{4=1;}', fmt=FMT_TEXT)
     {'4': '1'}
     """
-    return load(BytesIO(value), **kwargs)
+    if fmt is None and FMT_TEXT_HANDLER["detect"](bytes(value[:32])):
+        fmt = PF.FMT_TEXT
+
+    if fmt == PF.FMT_TEXT:
+        return FMT_TEXT_HANDLER["parser"](**kwargs).parse_buffer(value)
+    else:
+        return load(BytesIO(value), fmt=fmt, **kwargs)
+
+
+def load_path(path, *, mmap: bool = False, fmt=None, **kwargs) -> TextPlistTypes:
+    """
+    Read a .plist file by name. With `mmap`, the file is mapped into memory
+    and handed to `loads` instead of being read into a bytes object.
+    """
+    with open(path, "rb") as fp:
+        if mmap:
+            try:
+                buf = MMap(fp.fileno(), 0, access=ACCESS_READ)
+            except ValueError:
+                pass  # empty files cannot be mapped
+            else:
+                if kwargs.get("lazy"):
+                    # The proxies read from the map; it closes when they are gone.
+                    return loads(buf, fmt=fmt, **kwargs)
+                with buf:
+                    return loads(buf, fmt=fmt, **kwargs)
+        return load(fp, fmt=fmt, **kwargs)
+
+
+def load_strings(fp: BinaryIO, **kwargs) -> TextPlistTypes:
+    """Read a .strings file; see `TextPlistParser.parse_strings`."""
+    return FMT_TEXT_HANDLER["parser"](**kwargs).parse_strings(fp.read())
+
+
+def loads_strings(value, **kwargs) -> TextPlistTypes:
+    """
+    Read a .strings file from a str or bytes-like object.
+
+    >>> loads_strings(b'"a" = "b"; c;')
+    {'a': 'b', 'c': None}
+    """
+    return FMT_TEXT_HANDLER["parser"](**kwargs).parse_strings(value)
+
+
+def iterparse(fp: BinaryIO, *, chunk_size: int = 65536, **kwargs):
+    """
+    Read a text .plist file incrementally, yielding `(event, value)` pairs.
+
+    >>> list(iterparse(BytesIO(b'a = (1);')))[:3]
+    [('start_dict', None), ('key', 'a'), ('start_array', None)]
+    """
+    return FMT_TEXT_HANDLER["parser"](**kwargs).iterparse(fp, chunk_size=chunk_size)
 
 
 def dump(value: TextPlistTypes, fp, *, fmt=PF.FMT_TEXT, **kwargs):
@@ -128,9 +128,9 @@ class PlistParser(Parser):
                 self._typed_()
             self._error(
                 'expecting one of: '
-                '\'"\' \'(\' \'<\' \'<*\' \'<[\' \'{\' <array>'
-                '<base64data> <dict> <hexdata> <safechar>'
-                '<string> <typed>'
+                '"[^"\\]*(?:\\[\\s\\S][^"\\]*)*" \'(\' \'<\' \'<*\''
+                "'<[' '{' <array> <base64data> <dict>"
+                '<hexdata> <safechar> <string> <typed>'
                 '[-#!$%&*+./0-9:?@A-Z^_a-z|~]+'
             )
 
@@ -162,10 +162,7 @@ class PlistParser(Parser):
     @tatsumasu('BinType')
     def _hexdata_(self):  # noqa
         self._token('<')
-
-        def block1():
-            self._hexpairs_()
-        self._closure(block1)
+        self._pattern('[0-9a-fA-F\\s]*(?:(?:/\\*[^*]*\\*+(?:[^/*][^*]*\\*+)*/|//[^\\n]*)[0-9a-fA-F\\s]*)*')
         self.name_last_node('@')
         self._token('>')
 
@@ -183,10 +180,6 @@ class PlistParser(Parser):
         self.name_last_node('@')
         self._token('>')
 
-    @tatsumasu()
-    def _hexpairs_(self):  # noqa
-        self._pattern('(?i)([0-9a-f]{2})+')
-
     @tatsumasu()
     def _safechar_(self):  # noqa
         self._pattern('[-#!$%&*+./0-9:?@A-Z^_a-z|~]+')
@@ -200,65 +193,14 @@ class PlistParser(Parser):
                     self.name_last_node('sc')
             with self._option():
                 with self._group():
-                    self._token('"')
-                    self._cut()
-
-                    def block3():
-                        self._qchar_()
-                    self._closure(block3)
-                    self.name_last_node('ec')
-                    self._token('"')
-                    self._cut()
-
-                    self._define(
-                        ['ec'],
-                        []
-                    )
+                    self._pattern('"[^"\\\\]*(?:\\\\[\\s\\S][^"\\\\]*)*"')
+                    self.name_last_node('qs')
             self._error(
                 'expecting one of: '
-                '\'"\' <safechar>'
+                '"[^"\\]*(?:\\[\\s\\S][^"\\]*)*" <safechar>'
                 '[-#!$%&*+./0-9:?@A-Z^_a-z|~]+'
             )
 
-    @tatsumasu()
-    def _qchar_(self):  # noqa
-        with self._choice():
-            with self._option():
-                with self._group():
-                    self._pattern('[^"\\\\]+')
-                self.name_last_node('r')
-            with self._option():
-                with self._group():
-                    self._pattern('\\\\')
-                    self._esc_seq_()
-                self.name_last_node('e')
-            self._error(
-                'expecting one of: '
-                '[^"\\]+ \\'
-            )
-
-    @tatsumasu()
-    def _esc_seq_(self):  # noqa
-        with self._choice():
-            with self._option():
-                self._pattern('[abtrnvf]')
-            with self._option():
-                with self._group():
-                    self._pattern('(?i)u')
-                    self._pattern('(?i)[0-9a-f]{4}')
-            with self._option():
-                with self._group():
-                    self._pattern('x')
-                    self._pattern('(?i)[0-9a-f]{2}')
-            with self._option():
-                self._pattern('[0-7]{,3}')
-            with self._option():
-                self._pattern('.')
-            self._error(
-                'expecting one of: '
-                '(?i)u . [0-7]{,3} [abtrnvf] x'
-            )
-
     @tatsumasu()
     def _number_(self):  # noqa
         self._pattern('[0-9]+')
@@ -398,21 +340,12 @@ class PlistSemantics:
     def typed(self, ast):  # noqa
         return ast
 
-    def hexpairs(self, ast):  # noqa
-        return ast
-
     def safechar(self, ast):  # noqa
         return ast
 
     def string(self, ast):  # noqa
         return ast
 
-    def qchar(self, ast):  # noqa
-        return ast
-
-    def esc_seq(self, ast):  # noqa
-        return ast
-
     def number(self, ast):  # noqa
         return ast
 
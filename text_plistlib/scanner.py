@@ -0,0 +1,777 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+A hand-written parser for text plists.
+
+This covers the same grammar as openstep.ebnf, but scans each token with a
+single regular expression instead of going through the packrat machinery, so
+no memo table is built. Nested containers are kept on an explicit stack rather
+than the Python call stack, so any depth can be read.
+"""
+import re
+from array import array
+from binascii import a2b_base64
+from collections import namedtuple
+from functools import partial
+from plistlib import UID, InvalidFileException
+from typing import Optional, Union
+
+from .columns import as_array_type, make_columns
+from .dates import parse_date
+from .semantics import _COMMENTS, data_decoders, interners, unhex, unquote
+
+_SKIP = r"(?:\s|" + _COMMENTS + r")*"
+# Hex digits and the whitespace bytes.fromhex skips, as one character class:
+# large blobs are matched in one pass, and the pairs are checked when decoding.
+_HEX_RUN = r"[0-9a-fA-F \t\n\r\v\f]*"
+_INT = r"-?[0-9]+"
+_REAL = r"-?(?i:nan|inf|(?:[0-9]+(?:\.[0-9]*)?|\.[0-9]+)(?:e[-+]?[0-9]+)?)"
+
+# One token, preceded by whitespace and comments. Exactly one named group
+# matches, and its name (`m.lastgroup`) tells us what we are looking at.
+_TOKEN = re.compile(
+    _SKIP
+    + r"""(?:
+    (?P<safe>[-#!$%&*+./0-9:?@A-Z^_a-z|~]+)
+  | "(?P<quoted>[^"\\]*(?:\\.[^"\\]*)*)"
+  | (?P<semi>;) | (?P<eq>=) | (?P<comma>,)
+  | (?P<lbrace>\{) | (?P<rbrace>\}) | (?P<lparen>\() | (?P<rparen>\))
+  | <\*\s*(?:
+        I\s*"?\s*(?P<int>""" + _INT + r""")\s*"?
+      | U\s*"?\s*(?P<uid>[0-9]+)\s*"?
+      | R\s*"?\s*(?P<real>""" + _REAL + r""")\s*"?
+      | B\s*"?\s*(?P<bool>[YN])\s*"?
+      | D\s*"?\s*(?P<date>[^>"]+)"?
+      | (?P<nil>N)
+    )\s*>
+  | <\[(?P<b64>[^\]]*)\]>
+  | <(?P<hex>""" + _HEX_RUN + r"(?:(?:" + _COMMENTS + r")" + _HEX_RUN + r""")*)>
+  | (?P<eof>\Z)
+)""",
+    re.VERBOSE | re.DOTALL,
+)
+
+# The same, for scanning UTF-8 or ASCII bytes in place.
+_BTOKEN = re.compile(_TOKEN.pattern.encode("ascii"), re.VERBOSE | re.DOTALL)
+
+
+# How an array of nothing but `<*I...>` or `<*R...>` is read in one go.
+# Without comments, the text up to the first `)` is split at commas, with
+# digits turned into zeros so that few distinct pieces are left to check with
+# `piece`; the numbers are then what is left after blanking out the rest.
+# Arrays with comments are matched by `whole` and their numbers found with
+# `numbers`.
+_NumberArray = namedtuple(
+    "_NumberArray", "rest comment zero comma piece blank whole numbers conv typecode"
+)
+
+
+def _number_array(letter: str, number: str, conv, typecode: str, encode) -> _NumberArray:
+    item = r"<\*\s*" + letter + r'\s*"?\s*(?:' + number + r')\s*"?\s*>'
+    whole = (
+        _SKIP + item + r"(?:" + _SKIP + r"," + _SKIP + item + r")*"
+        + _SKIP + r"(?:," + _SKIP + r")?\)"
+    )
+    numbers = r"(?:" + _COMMENTS + r")|<\*\s*" + letter + r'\s*"?\s*(' + number + r")"
+    piece = r"\s*" + item.replace("[0-9]", "0") + r"\s*"
+    blank = '<*>,"' + letter
+    maketrans = str.maketrans if encode is str else bytes.maketrans
+    return _NumberArray(
+        rest=re.compile(encode(r"[^)]*\)")),
+        comment=re.compile(encode(r"/[*/]")),
+        zero=maketrans(encode("123456789"), encode("000000000")),
+        comma=encode(","),
+        piece=re.compile(encode(piece)),
+        blank=maketrans(encode(blank), encode(" " * len(blank))),
+        whole=re.compile(encode(whole)),
+        numbers=re.compile(encode(numbers)),
+        conv=conv,
+        typecode=typecode,
+    )
+
+
+def _number_arrays(encode) -> dict:
+    """`_NumberArray`s for str (`encode` is str) or bytes, by the token starting them."""
+    return {
+        "int": _number_array("I", _INT, int, "q", encode),
+        "real": _number_array("R", _REAL, float, "d", encode),
+    }
+
+
+_NUMBER_ARRAYS = _number_arrays(str)
+_BNUMBER_ARRAYS = _number_arrays(lambda s: s.encode("ascii"))
+
+
+# Token names as the grammar calls them, for error messages.
+_NAMES = {"b64": "base64data", "hex": "hexdata"}
+
+
+def _bad(kind, e) -> str:
+    return "invalid {k} ({e})".format(k=_NAMES.get(kind, kind), e=e)
+
+
+class _TokenStream:
+    """Tokens over an iterable of text chunks, keeping only the unread tail."""
+
+    def __init__(self, token, chunks):
+        self._token = token
+        self._chunks = iter(chunks)
+        self.buf = ""
+        self.pos = 0
+        self.offset = 0
+        self.done = False
+
+    def next(self):
+        while True:
+            m = self._token.match(self.buf, self.pos)
+            if self.done:
+                break
+            if m is not None and m.end() < len(self.buf):
+                # A bare word starting with "/*" or "//" is a comment that
+                # was given up on, because what follows it is cut off.
+                if m.lastgroup != "safe" or not m.group("safe").startswith(("/*", "//")):
+                    break
+            self._fill()
+        if m is None:
+            raise InvalidFileException(
+                "(offset {o}) expecting a token".format(o=self.offset + self.pos)
+            )
+        self.pos = m.end()
+        return m
+
+    def error(self, m, expected) -> InvalidFileException:
+        return self.fail(m, "expecting " + expected)
+
+    def fail(self, m, message) -> InvalidFileException:
+        return InvalidFileException(
+            "(offset {o}) {msg}".format(o=self.offset + m.start(m.lastgroup), msg=message)
+        )
+
+    def _fill(self):
+        # Read at least as much as we hold, so a long token takes linear time.
+        tail = self.buf[self.pos :]
+        parts = [tail]
+        want = max(len(tail), 1)
+        got = 0
+        while got < want:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                self.done = True
+                break
+            parts.append(chunk)
+            got += len(chunk)
+        self.offset += self.pos
+        self.buf = tail[:0].join(parts)
+        self.pos = 0
+
+
+class PlistScanner:
+    """
+    Parser producing the same values as PlistSemantics.
+
+    :param dict_type: Mapping type to build dictionaries with.
+    :param cfuid: Whether to collapse `{ CF$UID = <*I...>; }` into a UID.
+    :param max_depth: How deeply dictionaries and arrays may be nested, or
+    None for no limit. Deeper documents raise InvalidFileException.
+    :param data_type: What <hexdata> and <[base64]> become: bytes,
+    bytearray or memoryview.
+    :param intern_keys: Whether to keep one copy of each distinct key.
+    :param intern_values: Whether to do the same for string values: True for
+    all of them, or the length up to which they are shared.
+    :param intern_table: Dictionary to share strings through, for example
+    across documents. A new one is made for each scanner otherwise.
+    :param columns: Key paths (see `columns.key_paths`) of arrays of
+    dictionaries to read as `Columns`, or None.
+    :param numeric_arrays: Whether to read arrays of nothing but `<*I...>`
+    or nothing but `<*R...>` in one go, as arrays of numbers.
+    :param array_type: What arrays of numbers, including numeric columns,
+    become: "array" for `array.array`, or "numpy".
+    """
+
+    _token = _TOKEN
+    _newline = "\n"
+    _number_arrays = _NUMBER_ARRAYS
+
+    # Token converters for scalar values, by group name.
+    _scalars = {
+        "safe": str,
+        "quoted": unquote,
+        "int": int,
+        "uid": lambda s: UID(int(s)),
+        "real": float,
+        "bool": lambda s: s == "Y",
+        "date": parse_date,
+        "nil": lambda s: None,
+        "b64": a2b_base64,
+        "hex": unhex,
+    }
+
+    def __init__(
+        self,
+        *,
+        dict_type=dict,
+        cfuid: bool = True,
+        max_depth: Optional[int] = None,
+        data_type: type = bytes,
+        intern_keys: bool = False,
+        intern_values: Union[bool, int] = False,
+        intern_table: Optional[dict] = None,
+        columns: Optional[frozenset] = None,
+        numeric_arrays: bool = False,
+        array_type: str = "array",
+    ):
+        self.dict_type = dict_type
+        self.cfuid = cfuid
+        self.max_depth = max_depth
+        self.columns = columns or None
+        self.numeric_arrays = numeric_arrays
+        self.array_type = array_type
+        if data_type is not bytes:
+            hexdata, base64 = data_decoders(data_type)
+            self._scalars = dict(self._scalars, hex=hexdata, b64=base64)
+        # Converters for keys, which are "safe" or "quoted" tokens.
+        self._keys = self._scalars
+        key, value = interners(intern_keys, intern_values, intern_table)
+        if key is not None:
+            self._keys = self._sharing(key)
+        if value is not None:
+            self._scalars = self._sharing(value)
+
+    def _sharing(self, share):
+        """The scalar converters, with strings passed through `share`."""
+        safe, quoted = self._scalars["safe"], self._scalars["quoted"]
+        return dict(
+            self._scalars,
+            safe=lambda s: share(safe(s)),
+            quoted=lambda s: share(quoted(s)),
+        )
+
+    def parse(self, text: str, start: int = 0):
+        """Parse a whole document, following the `start` rule."""
+        m = self._next(text, start)
+        kind = m.lastgroup
+        if kind == "eof":
+            return self._entries(text, start, "eof")[0]
+        value, pos = self._value(text, m)
+        m = self._next(text, pos)
+        if m.lastgroup == "eof":
+            return value
+        if kind in ("safe", "quoted") and m.lastgroup in ("eq", "semi"):
+            # A key: this is a .strings style file.
+            return self._entries(text, start, "eof")[0]
+        raise self._error(text, m, "end of file")
+
+    def iterparse(self, chunks):
+        """
+        Parse a document from an iterable of text chunks, yielding
+        `(event, value)` pairs as soon as they are read.
+
+        The events are `start_dict`, `key`, `end_dict`, `start_array`,
+        `end_array` and `value`; only `key` and `value` carry a value. A key
+        without `= value` is followed by a `None` value, and a top-level
+        .strings file is reported as one dict. Dictionaries are reported as
+        they are written, so `CF$UID` dicts are not collapsed here.
+        """
+        stream = _TokenStream(self._token, chunks)
+        scalars = self._scalars
+        keys = self._keys
+        stack = []
+        m = stream.next()
+        kind = m.lastgroup
+        if kind == "eof":
+            yield "start_dict", None
+            yield "end_dict", None
+            return
+        if kind in ("safe", "quoted"):
+            token = m.group(kind)
+            m = stream.next()
+            if m.lastgroup == "eof":
+                yield "value", scalars[kind](token)
+                return
+            first = keys[kind](token)
+            if m.lastgroup not in ("eq", "semi"):
+                raise stream.error(m, "end of file")
+            self._enter(stack, stream, m)
+            stack.append("eof")
+            yield "start_dict", None
+            yield "key", first
+            state = "eq"
+        else:
+            state = "value"
+
+        while True:
+            kind = m.lastgroup
+            if state == "key":
+                if kind == "safe" or kind == "quoted":
+                    yield "key", keys[kind](m.group(kind))
+                    state = "eq"
+                elif kind == stack[-1]:
+                    stack.pop()
+                    yield "end_dict", None
+                    if kind == "eof":
+                        return
+                    state = "after"
+                else:
+                    raise stream.error(m, "a key")
+            elif state == "eq":
+                if kind == "eq":
+                    state = "value"
+                elif kind == "semi":
+                    yield "value", None
+                    state = "key"
+                else:
+                    raise stream.error(m, "';'")
+            elif state == "value" or state == "item":
+                conv = scalars.get(kind)
+                if conv is not None:
+                    try:
+                        value = conv(m.group(kind))
+                    except UnicodeDecodeError:
+                        raise
+                    except ValueError as e:
+                        raise stream.fail(m, _bad(kind, e)) from None
+                    yield "value", value
+                    state = "after"
+                elif kind == "lbrace":
+                    self._enter(stack, stream, m)
+                    stack.append("rbrace")
+                    yield "start_dict", None
+                    state = "key"
+                elif kind == "lparen":
+                    self._enter(stack, stream, m)
+                    stack.append("rparen")
+                    yield "start_array", None
+                    state = "item"
+                elif state == "item" and kind == "rparen":
+                    stack.pop()
+                    yield "end_array", None
+                    state = "after"
+                else:
+                    raise stream.error(m, "a value")
+            elif not stack:
+                if kind != "eof":
+                    raise stream.error(m, "end of file")
+                return
+            elif stack[-1] == "rparen":
+                if kind == "comma":
+                    state = "item"
+                elif kind == "rparen":
+                    stack.pop()
+                    yield "end_array", None
+                else:
+                    raise stream.error(m, "',' or ')'")
+            elif kind == "semi":
+                state = "key"
+            else:
+                raise stream.error(m, "';'")
+            m = stream.next()
+
+    def _enter(self, stack, stream, m):
+        """Check that one more container fits below `max_depth` in iterparse."""
+        if self.max_depth is not None and len(stack) >= self.max_depth:
+            raise InvalidFileException(
+                "(offset {o}) nested deeper than {n} levels".format(
+                    o=stream.offset + m.start(m.lastgroup), n=self.max_depth
+                )
+            )
+
+    def _next(self, text, pos):
+        m = self._token.match(text, pos)
+        if m is None:
+            raise self._error(text, pos, "a token")
+        return m
+
+    def _error(self, text, where, expected) -> InvalidFileException:
+        return self._fail(text, where, "expecting " + expected)
+
+    def _fail(self, text, where, message) -> InvalidFileException:
+        if not isinstance(where, int):
+            where = where.start(where.lastgroup)
+        line = text.count(self._newline, 0, where) + 1
+        col = where - text.rfind(self._newline, 0, where)
+        return InvalidFileException(
+            "({line}:{col}) {msg}".format(line=line, col=col, msg=message)
+        )
+
+    def _value(self, text, m):
+        """Convert the value starting with token `m`. Returns (value, end)."""
+        kind = m.lastgroup
+        conv = self._scalars.get(kind)
+        if conv is not None:
+            return self._convert(text, m, conv), m.end()
+        elif kind == "lbrace":
+            return self._nest(text, m, "rbrace")
+        elif kind == "lparen":
+            if self.numeric_arrays or self.columns is not None:
+                bulk = self._array(text, m, (), 0)
+                if bulk is not None:
+                    return bulk
+            return self._nest(text, m, "rparen")
+        raise self._error(text, m, "a value")
+
+    def _fits(self, depth: int) -> bool:
+        """Whether containers nested `depth` deep are within `max_depth`."""
+        return self.max_depth is None or depth <= self.max_depth
+
+    def _array(self, text, m, path, depth: int):
+        """
+        Read the array starting with token `m`, inside `depth` containers,
+        in one go if it can be: as numbers with `numeric_arrays`, or as
+        `Columns` if `path` is one of `columns`; `path` is None for an array
+        not reached through dictionaries alone. Returns (value, end), or None
+        to read it the usual way.
+        """
+        if self.numeric_arrays and self._fits(depth + 1):
+            numbers = self._number_array(text, m)
+            if numbers is not None:
+                return numbers
+        if self.columns is not None and path in self.columns and self._fits(depth + 2):
+            return self._table(text, m)
+        return None
+
+    def _number_array(self, text, m):
+        """
+        Read the array starting with token `m` as an `array.array` (or NumPy
+        array), if it holds nothing but `<*I...>` or nothing but `<*R...>`.
+        The whole array is matched by one regular expression and its numbers
+        converted together. Returns (array, end), or None for any other
+        array, including integers that do not fit in 64 bits.
+        """
+        start = m.end()
+        first = self._token.match(text, start)
+        if first is None or first.lastgroup not in self._number_arrays:
+            return None
+        spec = self._number_arrays[first.lastgroup]
+        rest = spec.rest.match(text, start)
+        if rest is None:
+            return None
+        end = rest.end()
+        body = text[start : end - 1]
+        if not isinstance(body, (str, bytes)):
+            body = bytes(body)
+        if spec.comment.search(body) is None:
+            parts = body.translate(spec.zero).split(spec.comma)
+            if len(parts) > 1 and not parts[-1].strip():
+                parts.pop()  # a trailing comma
+            if not all(spec.piece.fullmatch(p) for p in set(parts)):
+                return None
+            found = body.translate(spec.blank).split()
+        else:
+            whole = spec.whole.match(text, start)
+            if whole is None:
+                return None
+            end = whole.end()
+            found = filter(None, spec.numbers.findall(text, start, end))
+        try:
+            packed = array(spec.typecode, map(spec.conv, found))
+        except OverflowError:
+            return None
+        return as_array_type(packed, self.array_type), end
+
+    def _table(self, text, m):
+        """
+        Read the array starting with token `m` straight into `Columns`, if it
+        is a non-empty array of dictionaries with the same keys in the same
+        order and only scalar values. Returns (columns, end), or None for any
+        other array, which is then read the usual way; that also reports
+        whatever is wrong with it.
+        """
+        scalars = self._scalars
+        keys = self._keys
+        token = self._token.match
+        names = None
+        first = {}  # the first row, while it is read
+        columns = []
+        rows = 0
+        m = token(text, m.end())
+        while m is not None and m.lastgroup == "lbrace":
+            i = 0
+            while True:
+                m = token(text, m.end())
+                if m is None:
+                    return None
+                kind = m.lastgroup
+                if kind == "rbrace":
+                    break
+                if kind != "safe" and kind != "quoted":
+                    return None
+                key = keys[kind](m.group(kind))
+                repeated = False
+                if names is None:
+                    pass
+                elif i < len(names) and names[i] == key:
+                    i += 1
+                elif key in names[:i]:
+                    repeated = True
+                else:
+                    return None
+                m = token(text, m.end())
+                if m is None:
+                    return None
+                if m.lastgroup == "eq":
+                    m = token(text, m.end())
+                    if m is None:
+                        return None
+                    kind = m.lastgroup
+                    if kind == "lbrace":
+                        uid = self._uid(text, m) if self.cfuid else None
+                        if uid is None:
+                            return None
+                        value, m = uid
+                    else:
+                        conv = scalars.get(kind)
+                        if conv is None:
+                            return None
+                        try:
+                            value = conv(m.group(kind))
+                        except ValueError:
+                            return None
+                    m = token(text, m.end())
+                    if m is None:
+                        return None
+                else:
+                    value = None
+                if m.lastgroup != "semi":
+                    return None
+                # A repeated key keeps its first place and its last value, as
+                # in a dictionary.
+                if names is None:
+                    first[key] = value
+                elif repeated:
+                    columns[names.index(key)][-1] = value
+                else:
+                    columns[i - 1].append(value)
+            if names is None:
+                names = list(first)
+                if self.cfuid and names == ["CF$UID"]:
+                    return None  # UIDs
+                columns = [[v] for v in first.values()]
+            elif i != len(names):
+                return None
+            rows += 1
+            m = token(text, m.end())
+            if m is None:
+                return None
+            if m.lastgroup == "comma":
+                m = token(text, m.end())
+            elif m.lastgroup != "rparen":
+                return None
+        if m is None or m.lastgroup != "rparen" or not rows:
+            return None
+        return make_columns(names, columns, rows, self.array_type), m.end()
+
+    def _uid(self, text, m):
+        """
+        (UID, closing token) for the dictionary starting with token `m`, if
+        it is a `{ CF$UID = <*I...>; }` that collapses into one; else None.
+        """
+        token = self._token.match
+        m = token(text, m.end())
+        if m is None or m.lastgroup not in ("safe", "quoted"):
+            return None
+        if self._keys[m.lastgroup](m.group(m.lastgroup)) != "CF$UID":
+            return None
+        m = token(text, m.end())
+        if m is None or m.lastgroup != "eq":
+            return None
+        m = token(text, m.end())
+        conv = self._scalars.get(m.lastgroup) if m is not None else None
+        if conv is None:
+            return None
+        try:
+            uid = conv(m.group(m.lastgroup))
+        except ValueError:
+            return None
+        if not isinstance(uid, int):
+            return None
+        m = token(text, m.end())
+        if m is None or m.lastgroup != "semi":
+            return None
+        m = token(text, m.end())
+        if m is None or m.lastgroup != "rbrace":
+            return None
+        return UID(uid), m
+
+    def _convert(self, text, m, conv):
+        """`conv` applied to token `m`, with its errors placed in the text."""
+        kind = m.lastgroup
+        try:
+            return conv(m.group(kind))
+        except UnicodeDecodeError:
+            raise
+        except ValueError as e:
+            raise self._fail(text, m, _bad(kind, e)) from None
+
+    def _entries(self, text, pos, closing):
+        """Read `key [= value];` entries up to the `closing` token. Returns (dict, end)."""
+        return self._nest(text, pos, closing)
+
+    def _nest(self, text, where, closing, collapse: bool = True):
+        """
+        Read a dictionary (`closing` is "rbrace" or "eof") or an array
+        (`closing` is "rparen") and everything inside it, from the opening
+        token `where` or from an offset. Returns (value, end). Without
+        `collapse`, the outermost dictionary is never turned into a UID.
+
+        The containers still being read are kept on `stack`, together with
+        the `closing` token and pending key of each, so this loop runs in
+        constant Python stack space.
+        """
+        scalars = self._scalars
+        keys = self._keys
+        next_token = self._next
+        dict_type = self.dict_type
+        cfuid = self.cfuid
+        max_depth = self.max_depth
+        columns = self.columns
+        bulky = self.numeric_arrays or columns is not None
+        if max_depth is not None and max_depth < 1:
+            raise self._fail(text, where, "nested deeper than {n} levels".format(n=max_depth))
+        pos = where if isinstance(where, int) else where.end()
+        stack = []
+        container = [] if closing == "rparen" else dict_type()
+        key = None
+        while True:
+            m = next_token(text, pos)
+            kind = m.lastgroup
+            if kind == closing:
+                value = container
+                if cfuid and closing != "rparen" and len(value) == 1 and (stack or collapse):
+                    uid = value.get("CF$UID")
+                    if isinstance(uid, int):
+                        value = UID(uid)
+            else:
+                if closing != "rparen":
+                    if kind == "safe" or kind == "quoted":
+                        key = keys[kind](m.group(kind))
+                    else:
+                        raise self._error(text, m, "a key")
+                    m = next_token(text, m.end())
+                    if m.lastgroup == "semi":
+                        container[key] = None
+                        pos = m.end()
+                        continue
+                    if m.lastgroup != "eq":
+                        raise self._error(text, m, "';'")
+                    m = next_token(text, m.end())
+                    kind = m.lastgroup
+                conv = scalars.get(kind)
+                if conv is None:
+                    bulk = None
+                    if bulky and kind == "lparen":
+                        path = None
+                        if columns is not None and closing != "rparen" and all(c != "rparen" for _, c, _ in stack):
+                            path = tuple(k for _, _, k in stack) + (key,)
+                        bulk = self._array(text, m, path, len(stack) + 1)
+                    if bulk is None:
+                        if kind != "lbrace" and kind != "lparen":
+                            raise self._error(text, m, "a value")
+                        if max_depth is not None and len(stack) + 1 >= max_depth:
+                            raise self._fail(
+                                text, m, "nested deeper than {n} levels".format(n=max_depth)
+                            )
+                        stack.append((container, closing, key))
+                        if kind == "lbrace":
+                            container, closing = dict_type(), "rbrace"
+                        else:
+                            container, closing = [], "rparen"
+                        pos = m.end()
+                        continue
+                    value, end = bulk
+                else:
+                    try:
+                        value = conv(m.group(kind))
+                    except UnicodeDecodeError:
+                        raise
+                    except ValueError as e:
+                        raise self._fail(text, m, _bad(kind, e)) from None
+                    end = m.end()
+                m = next_token(text, end)
+                if closing != "rparen":
+                    container[key] = value
+                    if m.lastgroup != "semi":
+                        raise self._error(text, m, "';'")
+                    pos = m.end()
+                    continue
+                container.append(value)
+                if m.lastgroup == "comma":
+                    pos = m.end()
+                    continue
+                if m.lastgroup != "rparen":
+                    raise self._error(text, m, "',' or ')'")
+                value = container
+            # `value` is a finished container: store it in the enclosing ones,
+            # closing those that end right after it.
+            pos = m.end()
+            while True:
+                if not stack:
+                    return value, pos
+                container, closing, key = stack.pop()
+                m = next_token(text, pos)
+                pos = m.end()
+                if closing != "rparen":
+                    container[key] = value
+                    if m.lastgroup != "semi":
+                        raise self._error(text, m, "';'")
+                    break
+                container.append(value)
+                if m.lastgroup == "comma":
+                    break
+                if m.lastgroup != "rparen":
+                    raise self._error(text, m, "',' or ')'")
+                value = container
+
+
+class PlistBytesScanner(PlistScanner):
+    """
+    PlistScanner working directly on UTF-8 or ASCII bytes, including
+    memoryview and mmap objects. Only the tokens that become values are
+    copied out and decoded.
+
+    Whitespace is ASCII whitespace here, unlike the str scanner.
+    """
+
+    _token = _BTOKEN
+    _newline = b"\n"
+    _number_arrays = _BNUMBER_ARRAYS
+
+    def __init__(
+        self,
+        *,
+        dict_type=dict,
+        cfuid: bool = True,
+        max_depth: Optional[int] = None,
+        data_type: type = bytes,
+        encoding: str = "utf-8",
+        intern_keys: bool = False,
+        intern_values: Union[bool, int] = False,
+        intern_table: Optional[dict] = None,
+        columns: Optional[frozenset] = None,
+        numeric_arrays: bool = False,
+        array_type: str = "array",
+    ):
+        text = partial(str, encoding=encoding)
+        self._scalars = dict(
+            self._scalars,
+            safe=text,
+            quoted=lambda b: unquote(text(b)),
+            bool=lambda b: b == b"Y",
+            date=lambda b: parse_date(text(b)),
+        )
+        super().__init__(
+            dict_type=dict_type,
+            cfuid=cfuid,
+            max_depth=max_depth,
+            data_type=data_type,
+            intern_keys=intern_keys,
+            intern_values=intern_values,
+            intern_table=intern_table,
+            columns=columns,
+            numeric_arrays=numeric_arrays,
+            array_type=array_type,
+        )
+
+    def _fail(self, text, where, message) -> InvalidFileException:
+        if not isinstance(text, bytes):
+            text = bytes(text)
+        return super()._fail(text, where, message)
@@ -3,10 +3,18 @@
 """
 Semantic actions for assembling the Plist AST into its Python form.
 """
-from binascii import a2b_base64
-from datetime import datetime
+import re
+from binascii import a2b_base64, a2b_hex
+from functools import partial
 from plistlib import UID
 
+from .dates import parse_date
+
+# A line comment runs to the end of the line, even where a shorter match
+# would let the rest of a pattern match, as in the grammar.
+_COMMENTS = r"/\*[^*]*\*+(?:[^/*][^*]*\*+)*/|//[^\n]*(?![^\n])"
+_COMMENT = re.compile(_COMMENTS)
+
 one_char_esc = {
     "a": "\a",
     "b": "\b",
@@ -23,10 +31,126 @@ def _unsur(s: str) -> str:
     return s.encode("utf-16", "surrogatepass").decode("utf-16", "surrogatepass")
 
 
+# An escape, whose text is looked up in `_ESCAPES`. Without enough digits after
+# it, \u, \x or \8 stands for the character itself.
+_ESCAPE = re.compile(r"\\(?:[uU][0-9a-fA-F]{4}|x[0-9a-fA-F]{2}|[0-7]{1,3}|.)", re.DOTALL)
+_SURROGATE = re.compile("[\ud800-\udfff]")
+# How many other escapes, like \u ones, to remember once decoded.
+_ESCAPES_KEPT = 4096
+
+
+class _EscapeTable(dict):
+    """What each escape stands for, keyed by its text."""
+
+    def __missing__(self, esc: str) -> str:
+        c = esc[1]
+        if c in "01234567":
+            value = chr(int(esc[1:], 8))
+        elif len(esc) > 2:
+            value = chr(int(esc[2:], 16))
+        else:
+            value = one_char_esc.get(c, c)
+        if len(self) < _ESCAPES_KEPT:
+            self[esc] = value
+        return value
+
+
+# Filled in advance with the escapes of single ASCII characters and the
+# three-digit octal ones the writer makes.
+_ESCAPES = _EscapeTable()
+for _esc in ["\\" + chr(i) for i in range(128)] + ["\\{o:03o}".format(o=i) for i in range(256)]:
+    _ESCAPES.__missing__(_esc)
+del _esc
+
+
+def _escape(m) -> str:
+    return _ESCAPES[m[0]]
+
+
+def unquote(body: str) -> str:
+    """
+    Decode the escapes in the body of a quoted string. Surrogates are merged
+    only when a \\u escape made one.
+    """
+    if "\\" not in body:
+        return body
+    s = _ESCAPE.sub(_escape, body)
+    if ("\\u" in body or "\\U" in body) and _SURROGATE.search(s) is not None:
+        s = _unsur(s)
+    return s
+
+
+def unhex(body, into=bytes):
+    """
+    Decode the body of a <hexdata> literal, given as str or ASCII bytes.
+    Whitespace and comments may come between the pairs of digits. `into` is
+    bytes or bytearray, which both decode straight from the text.
+    """
+    if not isinstance(body, str):
+        if into is bytes and body.isalnum():
+            return a2b_hex(body)  # nothing to skip, no need to decode
+        body = str(body, "latin-1")
+    if "/" in body:
+        body = _COMMENT.sub("", body)
+    return into.fromhex(body)
+
+
+def data_decoders(data_type=bytes):
+    """
+    The (hexdata, base64) decoders giving `data_type` values: bytes,
+    bytearray, or a read-only memoryview of bytes.
+    """
+    if data_type is bytes:
+        return unhex, a2b_base64
+    elif data_type is bytearray:
+        return partial(unhex, into=bytearray), lambda s: bytearray(a2b_base64(s))
+    elif data_type is memoryview:
+        return lambda s: memoryview(unhex(s)), lambda s: memoryview(a2b_base64(s))
+    raise ValueError("unknown data_type {t!r}".format(t=data_type))
+
+
+def interners(keys=False, values=False, table=None):
+    """
+    Functions returning the string equal to theirs that is already in `table`,
+    so that repeated strings are kept once: (for keys, for string values), each
+    None when not asked for. `values` is True for all strings, or the length up
+    to which they are shared. A new table is used if `table` is None.
+    """
+    if not keys and not values:
+        return None, None
+    if table is None:
+        table = {}
+    setdefault = table.setdefault
+
+    def share(s):
+        return setdefault(s, s)
+
+    if values is True:
+        value = share
+    elif values:
+
+        def value(s):
+            return setdefault(s, s) if len(s) <= values else s
+
+    else:
+        value = None
+    return share if keys else None, value
+
+
 class PlistSemantics(object):
-    def __init__(self, dict_type=dict, cfuid=True):
+    def __init__(
+        self,
+        dict_type=dict,
+        cfuid=True,
+        data_type=bytes,
+        intern_keys=False,
+        intern_values=False,
+        intern_table=None,
+    ):
         self._dict_type = dict_type
         self.cfuid = cfuid
+        self._unhex, self._a2b_base64 = data_decoders(data_type)
+        self._key, self._value = interners(intern_keys, intern_values, intern_table)
 
     def start(self, ast, _=None):
         if ast.s is not None:
@@ -36,8 +160,9 @@ class PlistSemantics(object):
 
     def dict(self, ast, _=None):
         retval = self._dict_type()
+        key = self._key
         for entry in ast:
-            retval[entry.k] = entry.v
+            retval[entry.k if key is None else key(entry.k)] = entry.v
         if self.cfuid and len(retval) == 1 and isinstance(retval.get("CF$UID"), int):
             return UID(retval["CF$UID"])
         return retval
@@ -49,38 +174,17 @@ class PlistSemantics(object):
         return retval
 
     def hexdata(self, ast, _=None):
-        data = bytes.fromhex("".join(ast))
-        return data
+        return self._unhex(ast)
 
     def base64data(self, ast, _=None):
-        data = a2b_base64(ast)
-        return data
+        return self._a2b_base64(ast)
 
     def string(self, ast, _=None):
-        if ast.sc:
-            return ast.sc
-        else:
-            return _unsur("".join(ast.ec))
-
-    def qchar(self, ast):
-        if ast.r is not None:
-            return ast.r
-        elif ast.e is not None:
-            body = ast.e[1]
-            if isinstance(body, str):
-                global one_char_esc
-                if body in one_char_esc:
-                    return one_char_esc[body]
-                if body[0] in "01234567":
-                    return chr(int(body, 8))
-                else:
-                    return body
-            else:
-                # assert body[0] in 'xUU'
-                return chr(int(body[1], 16))
+        s = ast.sc if ast.sc else unquote(ast.qs[1:-1])
+        return s if self._value is None else self._value(s)
 
     def date(self, ast, _=None):
-        return datetime.strptime(ast, "%Y-%m-%d %H:%M:%S %z")
+        return parse_date(ast)
 
     def uid(self, ast, _=None):
         return UID(ast)
@@ -0,0 +1,243 @@
+"""
+Timings and counts for parsing and writing, kept only when asked for.
+
+Pass `stats=ParseStats()` to `TextPlistParser` (or `load`/`loads`), or
+`stats=WriteStats()` to `TextPlistWriter` (or `dump`/`dumps`). A stats object
+adds up every parse or write it is given to, so one can be kept to sample a
+service, and calls its `callback` after each. Without one, the parser and
+writer check for it once per call and otherwise run as they always do.
+
+A stats object is not locked: give parses that run at the same time one each.
+"""
+import time
+from array import array
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from plistlib import UID
+from typing import Any, Callable, Dict, Optional
+
+from .columns import Columns, _number_type, _values, is_ndarray_type
+
+_clock = time.perf_counter
+
+# What each type of value counts as in `nodes`.
+_KINDS = {
+    dict: "dict",
+    list: "array",
+    tuple: "array",
+    str: "string",
+    bytes: "data",
+    bytearray: "data",
+    memoryview: "data",
+    bool: "bool",
+    int: "int",
+    float: "float",
+    datetime: "date",
+    UID: "uid",
+    type(None): "null",
+}
+# And each writer method, for values written.
+_WRITTEN = {
+    "write_dict": "dict",
+    "write_list": "array",
+    "write_columns": "array",
+    "write_array": "array",
+    "write_string": "string",
+    "write_data": "data",
+    "write_bool": "bool",
+    "write_int": "int",
+    "write_float": "float",
+    "write_datetime": "date",
+    "write_uid": "uid",
+    "write_none": "null",
+}
+
+
+def _kind(t: type) -> str:
+    for base in t.__mro__:
+        if base in _KINDS:
+            return _KINDS[base]
+    return "other"
+
+
+class _Stats:
+    def __init__(self, callback: Optional[Callable] = None):
+        self.callback = callback
+        self.times: Dict[str, float] = {}
+        self.nodes: Counter = Counter()
+
+    @contextmanager
+    def phase(self, name: str):
+        """Add the time spent in the `with` block to `times[name]`."""
+        start = _clock()
+        try:
+            yield
+        finally:
+            self.times[name] = self.times.get(name, 0.0) + _clock() - start
+
+    def _done(self):
+        if self.callback is not None:
+            self.callback(self)
+
+
+class ParseStats(_Stats):
+    """
+    What parsing took, added up over every parse:
+
+    - `times`: seconds by phase. "read" is `fp.read()`, "decode" turning
+      bytes into str, "parse" scanning or tatsu's rule matching, of which
+      "semantics" is in tatsu's semantic actions; "post" is packing arrays
+      and columns after tatsu, and "count" finding the counts below.
+    - `bytes_in`: bytes parsed (characters, for a str).
+    - `nodes`: values in the results by kind: "dict", "array", "string",
+      "data", "int", "float", "bool", "date", "uid" and "null". Arrays of
+      numbers count each number; a `Columns` counts as an array of rows.
+      Keys are not counted, nor are lazy results, as that would parse them.
+    - `max_depth`: the most dictionaries and arrays nested in one another.
+    - `memo_entries`: the most entries tatsu's packrat memo table held.
+    - `parses`: how many parses these are for.
+    """
+
+    def __init__(self, callback: Optional[Callable[["ParseStats"], Any]] = None):
+        super().__init__(callback)
+        self.bytes_in = 0
+        self.max_depth = 0
+        self.memo_entries = 0
+        self.parses = 0
+
+    def __repr__(self):
+        return (
+            "ParseStats(parses={s.parses}, bytes_in={s.bytes_in}, times={s.times}, nodes={n}, "
+            "max_depth={s.max_depth}, memo_entries={s.memo_entries})"
+        ).format(s=self, n=dict(self.nodes))
+
+    def watch_tatsu(self, parser, semantics):
+        """
+        Semantics for `parser` that time the actions of `semantics`, with the
+        size of the parser's memo table watched as it grows.
+        """
+        memoize = getattr(parser, "_memoize", None)
+        if memoize is not None:
+
+            def watched(key, memo):
+                memoize(key, memo)
+                entries = len(parser._memos)
+                if entries > self.memo_entries:
+                    self.memo_entries = entries
+
+            parser._memoize = watched
+        return _TimedSemantics(semantics, self.times)
+
+    def done(self, value, count: bool = True):
+        """Record one parse giving `value`, counting its nodes with `count`."""
+        self.parses += 1
+        if count:
+            with self.phase("count"):
+                self._count(value)
+        self._done()
+
+    def _count(self, value):
+        nodes = self.nodes
+        max_depth = self.max_depth
+        stack = [(value, 0)]
+        while stack:
+            v, depth = stack.pop()
+            t = type(v)
+            if isinstance(v, Columns):
+                max_depth = max(max_depth, depth + 2)
+                nodes["array"] += 1
+                nodes["dict"] += v.rows
+                for column in v.values():
+                    stack.extend((x, depth + 2) for x in _values(column))
+                continue
+            if t is array or is_ndarray_type(t):
+                max_depth = max(max_depth, depth + 1)
+                nodes["array"] += 1
+                number = _number_type(v)
+                nodes[_KINDS[number] if number is not None else "other"] += len(v)
+                continue
+            kind = _KINDS.get(t) or _kind(t)
+            nodes[kind] += 1
+            if kind == "dict":
+                v = v.values()
+            elif kind != "array":
+                continue
+            max_depth = max(max_depth, depth + 1)
+            stack.extend((x, depth + 1) for x in v)
+        self.max_depth = max_depth
+
+
+class _TimedSemantics:
+    """Semantics whose actions add the time they take to `times["semantics"]`."""
+
+    def __init__(self, semantics, times: Dict[str, float]):
+        self._semantics = semantics
+        self._times = times
+
+    def __getattr__(self, name):
+        action = getattr(self._semantics, name)
+        if not callable(action):
+            return action
+        times = self._times
+
+        def timed(*args, **kwargs):
+            start = _clock()
+            try:
+                return action(*args, **kwargs)
+            finally:
+                times["semantics"] = times.get("semantics", 0.0) + _clock() - start
+
+        setattr(self, name, timed)  # tatsu looks actions up for every rule
+        return timed
+
+
+class WriteStats(_Stats):
+    """
+    What writing took, added up over every `write`:
+
+    - `times`: seconds by phase. "write" is the whole of `write`, of which
+      "flush" is in the file's `write`.
+    - `bytes_out`: bytes written to the file, and `write_calls` how many
+      calls to its `write` that took.
+    - `nodes`: values written by kind, as in `ParseStats`. An array of
+      numbers written in one go counts as one array.
+    - `writes`: how many values were written with `write`.
+    """
+
+    def __init__(self, callback: Optional[Callable[["WriteStats"], Any]] = None):
+        super().__init__(callback)
+        self.bytes_out = 0
+        self.write_calls = 0
+        self.writes = 0
+
+    def __repr__(self):
+        return (
+            "WriteStats(writes={s.writes}, bytes_out={s.bytes_out}, write_calls={s.write_calls}, "
+            "times={s.times}, nodes={n})"
+        ).format(s=self, n=dict(self.nodes))
+
+    def flush(self, fp, data):
+        """Write `data` to `fp`, counting it."""
+        with self.phase("flush"):
+            fp.write(data)
+        self.bytes_out += len(data)
+        self.write_calls += 1
+
+    def counting(self, handler: Callable, method: str) -> Callable:
+        """`handler` for a writer method, counting the values it is given."""
+        kind = _WRITTEN.get(method)
+        if kind is None:
+            return handler
+        nodes = self.nodes
+
+        def counted(val):
+            nodes[kind] += 1
+            return handler(val)
+
+        return counted
+
+    def done(self):
+        """Record one `write`."""
+        self.writes += 1
+        self._done()
@@ -0,0 +1,197 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+A reader for .strings files, whose entries are `"key" = "value";` with string
+keys and values, and comments in between.
+
+Two shortcuts are tried in turn, each giving up at the first entry it cannot
+read, so that the general parser can take over from there:
+
+1. Splitting the text at every double quote, escaped ones hidden first, so
+   that quoted strings are found at C speed. What lies between them has to be
+   `=` or `;` with whitespace and comments around it, which is checked once
+   for each distinct piece. When every entry is `"key" = "value";`, the keys
+   and values are then every fourth piece, and go into the dictionary at once.
+2. One regular expression per entry, which also takes unquoted strings and
+   quotes inside comments.
+"""
+import re
+from typing import Optional, Tuple, Union
+
+from .lazy import _SAFE
+from .scanner import _SKIP
+from .semantics import interners, unquote
+
+# Whitespace and comments between two quotes. A line comment has to end
+# there as well, or else the quote after it would be inside it.
+_GAP_SKIP = r"(?:\s|/\*[^*]*\*+(?:[^/*][^*]*\*+)*/|//[^\n]*\n)*"
+_LEAD = re.compile(_GAP_SKIP + r"\Z")
+_GAP = re.compile(_GAP_SKIP + r"(?:(=)|;)" + _GAP_SKIP + r"\Z")
+_TAIL = re.compile(_GAP_SKIP + r";" + _SKIP + r"\Z")
+
+# How many distinct gaps to remember; others are checked every time.
+_GAPS_KEPT = 1024
+
+
+def _string(name: str) -> str:
+    # An unquoted string is matched atomically through a lookahead and never
+    # starts a comment, so this backtracks no further than the scanner does.
+    return (
+        r"(?:(?!//|/\*)(?=(?P<" + name + r"s>" + _SAFE + r"+))(?P=" + name + r"s)"
+        r'|"(?P<' + name + r'q>[^"\\]*(?:\\.[^"\\]*)*)")'
+    )
+
+
+def _skip(name: str) -> str:
+    # Atomic as well: backtracking into a line comment would find entries in it.
+    return r"(?=(?P<" + name + r">" + _SKIP + r"))(?P=" + name + r")"
+
+
+_ENTRY = re.compile(
+    _skip("s1") + _string("k") + _skip("s2")
+    + r"(?:=" + _skip("s3") + _string("v") + _skip("s4") + r")?;",
+    re.DOTALL,
+)
+_END = re.compile(_SKIP + r"\Z")
+
+
+class StringsParser:
+    """
+    Reads the entries of a .strings file for as long as their keys and
+    values are strings.
+
+    :param dict_type: Mapping type to build the dictionary with.
+    :param intern_keys, intern_values, intern_table: As for `PlistScanner`.
+    """
+
+    def __init__(
+        self,
+        *,
+        dict_type=dict,
+        intern_keys: bool = False,
+        intern_values: Union[bool, int] = False,
+        intern_table: Optional[dict] = None,
+    ):
+        self.dict_type = dict_type
+        self._key, self._value = interners(intern_keys, intern_values, intern_table)
+
+    def parse(self, text: str, start: int = 0) -> Tuple[dict, int]:
+        """
+        Read entries from `start`. Returns (dict, end), where `end` is the
+        length of `text` if everything was read, or else the offset of the
+        first entry that is not just strings, or not an entry at all.
+        """
+        retval = self.dict_type()
+        pos = self._split(text, start, retval)
+        if pos < len(text):
+            pos = self._entries(text, pos, retval)
+        if self._key is not None or self._value is not None:
+            retval = self._shared(retval)
+        return retval, pos
+
+    def _shared(self, entries):
+        """`entries` again, with the strings in them interned."""
+        key, value = self._key, self._value
+        retval = self.dict_type()
+        for k, v in entries.items():
+            if key is not None:
+                k = key(k)
+            if value is not None and v is not None:
+                v = value(v)
+            retval[k] = v
+        return retval
+
+    @staticmethod
+    def _split(text: str, start: int, retval) -> int:
+        body = text[start:] if start else text
+        hidden = '\\"' in body
+        if hidden:
+            if "\0" in body:
+                return start
+            # Hide escaped quotes, and the escaped backslashes that may come
+            # before them, so that only real quotes split the text.
+            body = body.replace("\\\\", "\0\1").replace('\\"', "\0\2")
+        parts = body.split('"')
+        if _LEAD.match(parts[0]) is None:
+            return start
+        last = len(parts) - 1
+        if last == 0:
+            return len(text)
+        # Strings are the odd pieces, unless the last one is not closed.
+        tail = last % 2 == 0 and _TAIL.match(parts[last]) is not None
+        escaped = hidden or "\\" in body
+        gaps = {}
+        if tail and last % 4 == 0 and _all(parts[2::4], "=", gaps) and _all(parts[4:last:4], ";", gaps):
+            # Nothing but "key" = "value"; entries.
+            keys, values = parts[1::4], parts[3::4]
+            if escaped:
+                keys = [_decode(k, hidden) if "\\" in k or "\0" in k else k for k in keys]
+                values = [_decode(v, hidden) if "\\" in v or "\0" in v else v for v in values]
+            retval.update(zip(keys, values))
+            return len(text)
+        i = 1
+        while i < last:
+            key = _decode(parts[i], hidden) if escaped else parts[i]
+            if i + 1 == last:
+                if tail:
+                    retval[key] = None
+                    return len(text)
+                break
+            kind = gaps.get(parts[i + 1]) or _kind(parts[i + 1], gaps)
+            if kind == ";":
+                retval[key] = None
+                i += 2
+                continue
+            if kind != "=":
+                break
+            value = _decode(parts[i + 2], hidden) if escaped else parts[i + 2]
+            if i + 3 == last:
+                if tail:
+                    retval[key] = value
+                    return len(text)
+                break
+            if (gaps.get(parts[i + 3]) or _kind(parts[i + 3], gaps)) != ";":
+                break
+            retval[key] = value
+            i += 4
+        # The opening quote of the entry that did not fit.
+        return start + sum(len(p) for p in parts[:i]) + i - 1
+
+    @staticmethod
+    def _entries(text: str, pos: int, retval) -> int:
+        match = _ENTRY.match
+        while True:
+            m = match(text, pos)
+            if m is None:
+                break
+            ks, kq, vs, vq = m.group("ks", "kq", "vs", "vq")
+            if ks is None:
+                ks = unquote(kq) if "\\" in kq else kq
+            if vq is not None:
+                vs = unquote(vq) if "\\" in vq else vq
+            retval[ks] = vs
+            pos = m.end()
+        if _END.match(text, pos) is not None:
+            return len(text)
+        return pos
+
+
+def _decode(s: str, hidden: bool) -> str:
+    """Put back what `_split` hid, and decode the escapes."""
+    if hidden and "\0" in s:
+        s = s.replace("\0\1", "\\\\").replace("\0\2", '\\"')
+    return unquote(s) if "\\" in s else s
+
+
+def _all(gaps, kind: str, known: dict) -> bool:
+    """Whether each of `gaps` is a `kind` ('=' or ';') gap."""
+    return all((known.get(g) or _kind(g, known)) == kind for g in set(gaps))
+
+
+def _kind(gap: str, gaps: dict):
+    """'=' or ';' for what is between two strings, or None. Remembered in `gaps`."""
+    m = _GAP.match(gap)
+    kind = None if m is None else "=" if m.group(1) else ";"
+    if len(gaps) < _GAPS_KEPT:
+        gaps[gap] = kind
+    return kind